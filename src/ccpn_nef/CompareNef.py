@@ -59,7 +59,7 @@ The general structure of a Nef file is:
 DataExtent, DataBlock and SaveFrame are Python OrderedDict with an additional 'name' attribute
 DataBlocks and SaveFrames are entered in their container using their name as the key.
 
-Loop is an object with a 'columns' list, a 'data' list-of-row-OrderedDict, and a name attribute
+Loop is an object with a 'columns' list, a 'data' list-of-row-dict, and a name attribute
 set equal to the name of the first column. A loop is entered in its container under each
 column name, so that e.g. aSaveFrame['_Loopx.loopcol1'] and aSaveFrame['_Loopx.loopcol2'] both
 exist and both correspond to the same loop object.
@@ -54,6 +54,7 @@ NEFERROR_BADADDSAVEFRAME = -14
 NEFERROR_READATTRIBUTENAMES = -15
 NEFERROR_READATTRIBUTE = -16
 NEFERROR_BADKEYS = -17
+NEFERROR_BADVALIDATION = -18
 
 
 class ErrorLog():
@@ -96,7 +97,8 @@ class ErrorLog():
                  NEFERROR_GENERICGETTABLEERROR : 'table error',
                  NEFERROR_READATTRIBUTENAMES   : 'error reading attribute names',
                  NEFERROR_READATTRIBUTE        : 'error reading attribute',
-                 NEFERROR_BADKEYS              : 'error reading keys'}
+                 NEFERROR_BADKEYS              : 'error reading keys',
+                 NEFERROR_BADVALIDATION        : 'error validating'}
 
     def __init__(self, logOutput=sys.stderr.write, loggingMode=NEF_STANDARD, errorCode=NEFVALID):
         """
@@ -118,7 +120,8 @@ class ErrorLog():
         @wraps(func)
         def errortesting(obj, *args, **kwargs):
             try:
-                obj._logError(errorCode=NEFVALID)
+                # same as _logError(errorCode=NEFVALID), without the extra call on every wrapped method
+                obj._clearError()
                 return func(obj, *args, **kwargs)
 
             except (RuntimeError, StarSyntaxError) as es:
@@ -47,7 +47,7 @@ The object structure returned is:
 DataExtent, DataBlock and SaveFrame are Python OrderedDict with an additional 'name' attribute
 DataBlocks and SaveFrames are entered in their container using their name as the key.
 
-Loop is an object with a 'columns' list, a 'data' list-of-row-OrderedDict, and a name attribute
+Loop is an object with a 'columns' list, a 'data' list-of-row-dict, and a name attribute
 set equal to the name of the first column. A loop is entered in its container under each
 column name, so that e.g. aSaveFrame['_Loopx.loopcol1'] and aSaveFrame['_Loopx.loopcol2'] both
 exist and both correspond to the same loop object.
@@ -149,6 +149,7 @@ except:
     # python 2.7
     from itertools import izip_longest as zip_longest
 from .StarTokeniser import getTokenIterator
+from .StarTokeniser import iterTokenTuples
 
 from .StarTokeniser import TOKEN_MULTILINE
 from .StarTokeniser import TOKEN_COMMENT
@@ -313,6 +314,32 @@ class StarContainer(NamedOrderedDict):
             # No column matches a loop. return a single dict
             return (valueDict,)
 
+    def columnValues(self, column):
+        """get list of values for a single column.
+        Will work whether the column is in a loop or a single value.
+        If the column is in a loop, return the values from each row,
+        otherwise return a list with the single value.
+        If the column does not match return None"""
+        value = self.get(column)
+        if value is None:
+            return None
+        elif isinstance(value, Loop):
+            return value.column(column)
+        else:
+            return [value]
+
+    def countValues(self, column):
+        """get the number of values for a single column without fetching them.
+        Returns the number of rows if the column is in a loop, 1 for a single value
+        and 0 if the column does not match"""
+        value = self.get(column)
+        if value is None:
+            return 0
+        elif isinstance(value, Loop):
+            return len(value.data)
+        else:
+            return 1
+
     def _contentToString(self, indent=_defaultIndent, separator=_defaultSeparator):
         """Returns content of either DataBlock or SaveFrame as a string"""
 
@@ -404,8 +431,16 @@ class SaveFrame(StarContainer):
                                                        separator=separator), indent))
 
 
-class LoopRow(OrderedDict):
-    """Loop row - OrderedDict with additional functionality"""
+class LoopRow(dict):
+    """Loop row - dict with additional functionality.
+    A plain dict keeps the columns in insertion order and is smaller than an OrderedDict.
+
+    NB LoopRow was previously an OrderedDict subclass. Iteration order and string output
+    are unchanged, but rows no longer have the OrderedDict-only move_to_end and
+    popitem(last=...) methods, and row equality no longer depends on column order"""
+
+    # Rows are numerous, and have no attributes other than their items
+    __slots__ = ()
 
     def _get(self, name):
         """Returns value of attribute 'name', or None if attribute is not defined
@@ -451,7 +486,7 @@ class Loop:
 
     - columns:  List of string column headers
 
-    - data: List-of-rows, where rows are OrderedDicts """
+    - data: List-of-rows, where rows are (ordered) dicts """
 
     # Tag prefix for string output, which is prefixed to column names before writing.
     # Can be set in subclass instances.
@@ -476,6 +511,12 @@ class Loop:
         """Column names"""
         return tuple(self._columns)
 
+    def column(self, columnName):
+        """List of the values in column columnName, one per row"""
+        if columnName not in self._columns:
+            raise ValueError("%s: column named %s does not exist" % (self, columnName))
+        return [row[columnName] for row in self.data]
+
     def newRow(self, values=None):
         """Add new row, initialised from values"""
 
@@ -500,6 +541,18 @@ class Loop:
         self.data.append(row)
         return row
 
+    def extendRows(self, rows):
+        """Add new rows, each initialised from a sequence of values in column order"""
+
+        # Use internal attribute for speed, columns do not change
+        columns = self._columns
+        numColumns = len(columns)
+        append = self.data.append
+        for values in rows:
+            if len(values) > numColumns:
+                raise ValueError("Row passed %s values for %s columns" % (len(values), numColumns))
+            append(LoopRow(zip(columns, values)))
+
     def addColumn(self, columnName, paddingValue=sentinel):
         """Add new column to loop. if paddingValue is set, including to None, rows with None"""
         columns = self._columns
@@ -557,7 +610,7 @@ class Loop:
         if data:
 
             # First convert to strings to get correct columns widths
-            if isinstance((data[0]), OrderedDict):
+            if isinstance((data[0]), dict):
                 data = [[valueToStarString(y) for y in list(x.values())] for x in self.data]
             else:
                 # Must be a sequence of some kind. This will break for non-ordered dicts
@@ -702,7 +755,7 @@ class GeneralStarParser:
         self.allowSquareBracketStrings = allowSquareBracketStrings
         self.lowerCaseTags = lowerCaseTags
 
-        self.tokeniser = getTokenIterator(text)
+        self.tokeniser = iterTokenTuples(text)
         self.text = text
 
         self.stack = []
@@ -750,8 +803,7 @@ class GeneralStarParser:
 
             # Make rows:
             args = [iter(data)] * columnCount
-            for tt in zip_longest(*args, fillvalue=NULLSTRING):
-                loop.newRow(values=tt)
+            loop.extendRows(zip_longest(*args, fillvalue=NULLSTRING))
 
         else:
             # empty loops appear here. We allow them, but that could change
@@ -59,6 +59,7 @@ NefImporter contains:
 
   toString            convert Nef dictionary to a string that can be written to a file
   fromString          convert string to Nef dictionary
+  validate            validate the Nef dictionary against the validation dictionary
 
   getAttributeNames   get a list of the attributes attached to the dictionary
   getAttribute        return the value of the attribute
@@ -165,7 +166,7 @@ The general structure of a Nef file is:
 DataExtent, DataBlock and SaveFrame are Python OrderedDict with an additional 'name' attribute
 DataBlocks and SaveFrames are entered in their container using their name as the key.
 
-Loop is an object with a 'columns' list, a 'data' list-of-row-OrderedDict, and a name attribute
+Loop is an object with a 'columns' list, a 'data' list-of-row-dict, and a name attribute
 set equal to the name of the first column. A loop is entered in its container under each
 column name, so that e.g. aSaveFrame['_Loopx.loopcol1'] and aSaveFrame['_Loopx.loopcol2'] both
 exist and both correspond to the same loop object.
@@ -207,6 +208,7 @@ import sys
 import re
 import numpy as np
 from collections import OrderedDict, namedtuple
+from functools import lru_cache
 from pathlib import Path
 
 
@@ -479,6 +481,74 @@ NEF_CATEGORIES_REMOVEPREFIX = {'nef_distance_restraint'         : 'distance_rest
                                'nef_dihedral_restraint'         : 'dihedral_restraint'}
 
 NEF_CATEGORIES_INSERTPREFIX = dict((val, key) for key, val in NEF_CATEGORIES_REMOVEPREFIX.items())
+if len(NEF_CATEGORIES_INSERTPREFIX) != len(NEF_CATEGORIES_REMOVEPREFIX):
+    raise RuntimeError('NEF_CATEGORIES_REMOVEPREFIX contains duplicate values')
+
+# (prefix, replacement) pairs sorted longest-first, so that the longest matching category is always used,
+# e.g. 'distance_restraint_list' before 'distance_restraint'
+NEF_CATEGORIES_REMOVEPREFIX_ITEMS = tuple(sorted(NEF_CATEGORIES_REMOVEPREFIX.items(), key=lambda kv: -len(kv[0])))
+NEF_CATEGORIES_INSERTPREFIX_ITEMS = tuple(sorted(NEF_CATEGORIES_INSERTPREFIX.items(), key=lambda kv: -len(kv[0])))
+NEF_CATEGORIES_REMOVEPREFIX_SET = frozenset(NEF_CATEGORIES_REMOVEPREFIX)
+NEF_CATEGORIES_INSERTPREFIX_SET = frozenset(NEF_CATEGORIES_INSERTPREFIX)
+
+# single alternation of all the category prefixes, longest-first so the longest matching category is found
+_REGEXREMOVEPREFIX = re.compile('|'.join(re.escape(db) for db, _ in NEF_CATEGORIES_REMOVEPREFIX_ITEMS))
+_REGEXINSERTPREFIX = re.compile('|'.join(re.escape(db) for db, _ in NEF_CATEGORIES_INSERTPREFIX_ITEMS))
+
+
+# the prefix functions are cached, the same small set of saveFrame/table/attribute names is converted repeatedly
+@lru_cache(maxsize=512)
+def _removeCategoryPrefix(name):
+    """Remove the prefix 'nef_' from a name starting with a Nef category
+    """
+    if name in NEF_CATEGORIES_REMOVEPREFIX_SET:
+        # exact category name, e.g. a table name
+        return NEF_CATEGORIES_REMOVEPREFIX[name]
+    match = _REGEXREMOVEPREFIX.match(name)
+    if match:
+        return NEF_CATEGORIES_REMOVEPREFIX[match.group()] + name[match.end():]
+    return name
+
+
+@lru_cache(maxsize=512)
+def _insertCategoryPrefix(name):
+    """Insert the prefix 'nef_' into a name starting with a Nef category
+    """
+    if name in NEF_CATEGORIES_INSERTPREFIX_SET:
+        # exact category name, e.g. a table name
+        return NEF_CATEGORIES_INSERTPREFIX[name]
+    match = _REGEXINSERTPREFIX.match(name)
+    if match:
+        return NEF_CATEGORIES_INSERTPREFIX[match.group()] + name[match.end():]
+    return name
+
+
+# category names returned by getCategories, with and without the 'nef_' prefix
+_CATEGORIES_VISIBLE = tuple(nm[0] for nm in NEF_CATEGORIES)
+_CATEGORIES_HIDDEN = tuple(_removeCategoryPrefix(nm) for nm in _CATEGORIES_VISIBLE)
+
+
+# replacement of Nef strings when converting tables to pandas dataFrames
+_PANDAS_VALUE_MAP = {'.': np.nan, 'true': True, 'false': False}
+
+# sentinel for dictionary lookups where None is a valid value
+_MISSING = object()
+
+# pandas is optional, imported on the first conversion of a table to a dataFrame; False if not available
+_pandas = None
+
+
+def _getPandas():
+    """Return the pandas module, or False if it cannot be imported
+    """
+    global _pandas
+    if _pandas is None:
+        try:
+            import pandas
+        except ImportError:
+            pandas = False
+        _pandas = pandas
+    return _pandas
 
 NEF_RETURNALL = 'all'
 NEF_RETURNNEF = 'nef_'
@@ -497,7 +567,10 @@ def _tryNumber(value):
                 pass
 
 
-REGEXREMOVEENDQUOTES = u'\`\d*`+?'
+REGEXREMOVEENDQUOTES = r'\`\d*`+?'
+_REGEXENDQUOTES = re.compile(REGEXREMOVEENDQUOTES)
+# single pass split of the saveframe name into optional `n` prefix, subname and optional `n` postfix
+_REGEXFRAMENAME = re.compile(r'\A(?P<prefix>`\d*`)?(?P<subname>.*?)(?P<postfix>`\d*`)?\Z', re.DOTALL)
 _nameFromCategory = namedtuple('_nameFromCategory', ('framecode', 'frameName', 'subname', 'prefix', 'postfix', 'precode', 'postcode', 'category'))
 
 
@@ -505,24 +578,35 @@ def _saveFrameNameFromCategory(saveFrame: StarIo.NmrSaveFrame):
     """Parse the saveframe name to extract pre- and post- numbering
     necessary for restraint and spectrum saveframe names
     """
-    category = saveFrame['sf_category']
-    framecode = saveFrame['sf_framecode']
-    # frameName = framecode[len(category) + 1:]
-    return _getNameFromCategory(category, framecode)
+    return _getNameFromCategory(saveFrame['sf_category'], saveFrame['sf_framecode'])
 
 
+@lru_cache(maxsize=4096)
 def _getNameFromCategory(category, framecode):
     # check for any occurrences of `n` in the saveframe name and keep for later reference
+    # results are cached, the same (category, framecode) pairs are parsed repeatedly
     frameName = framecode[len(category) + 1:]
 
-    names = re.split(REGEXREMOVEENDQUOTES, frameName)
-    if 0 <= len(names) > 3:
-        raise TypeError('bad splitting of saveframe name {}'.format(framecode))
-    subName = re.sub(REGEXREMOVEENDQUOTES, '', frameName)
-    matches = [mm for mm in re.finditer(REGEXREMOVEENDQUOTES, frameName)]
-    prefix = matches[0].group() if matches and matches[0] and matches[0].span()[0] == 0 else ''
+    match = _REGEXFRAMENAME.match(frameName)
+    subName = match.group('subname')
+    if '`' not in subName:
+        prefix = match.group('prefix') or ''
+        postfix = match.group('postfix') or ''
+        if prefix and match.end('prefix') == len(frameName):
+            # name consists of only `n`, this is both the prefix and the postfix
+            postfix = prefix
+    else:
+        # rare - stray quotes in the name, scan for all occurrences of `n`
+        subName, quoteCount = _REGEXENDQUOTES.subn('', frameName)
+        if quoteCount > 2:
+            raise TypeError('bad splitting of saveframe name {}'.format(framecode))
+        # at most two matches, take the first and last directly from the iterator
+        quotes = _REGEXENDQUOTES.finditer(frameName)
+        first = next(quotes, None)
+        last = next(quotes, first)
+        prefix = first.group() if first and first.start() == 0 else ''
+        postfix = last.group() if last and last.end() == len(frameName) else ''
     preSerial = _tryNumber(prefix)
-    postfix = matches[-1].group() if matches and matches[-1] and matches[-1].span()[1] == len(frameName) else ''
     postSerial = _tryNumber(postfix)
 
     return _nameFromCategory(framecode, frameName, subName, prefix, postfix, preSerial, postSerial, category)
@@ -556,12 +640,19 @@ class NefImporter(el.ErrorLog):
         self._isValid = False
 
         # No data read so far
-        self._saveFrameNames = {}
         self._nefDict = {}
+        # True when _nefDict holds a parsed datablock, rather than the empty/initialised dict
+        self._isLoaded = False
         # self._initialise()  # initialise a basic object
 
         self._path = None
 
+        # methods attached by _attachReader/_attachVerifier/_attachContent/_attachClear
+        self._reader = None
+        self._verifier = None
+        self._content = None
+        self._clear = None
+
     @property
     def data(self) -> StarIo.NmrDataBlock:
         """Return the NmrDataBlock instance
@@ -577,7 +668,9 @@ class NefImporter(el.ErrorLog):
     def _logFunc(self, *args):
         """Simple logger for CifDicConverter using _logError
         """
-        self._logError(errorString=''.join([str(arg) for arg in args]))
+        # called with the default errorCode, _logError only clears the last error and discards the string,
+        # so don't build the message from args
+        self._logError()
 
     @el.ErrorLog(errorCode=el.NEFERROR_ERRORLOADINGFILE)
     def loadValidateDictionary(self, fileName=None, mode='standard'):
@@ -617,6 +710,19 @@ class NefImporter(el.ErrorLog):
         self._isValid = result
         return result
 
+    def _clearValidation(self):
+        """Reset the validation state after loading data that has not been validated
+        """
+        self._isValid = False
+        self._validator._validation_errors = None
+
+    @el.ErrorLog(errorCode=el.NEFERROR_BADVALIDATION)
+    def validate(self) -> bool:
+        """Validate the current Nef dictionary against the validation dictionary
+        :return True if valid, errors are available from validErrorLog
+        """
+        return self._doValidate()
+
     @property
     def isValid(self) -> bool:
         """
@@ -636,33 +742,26 @@ class NefImporter(el.ErrorLog):
     def _namedToNefDict(self, frame):
         # change a saveFrame into a normal OrderedDict
         newItem = NefDict(inFrame=frame, errorLogging=self.loggingMode)
-        for ky in frame.keys():
-            newItem[ky] = frame[ky]
+        for ky, val in frame.items():
+            newItem[ky] = val
         return newItem
 
     def _removePrefix(self, name):
         if self._hidePrefix:
-            for db in NEF_CATEGORIES_REMOVEPREFIX.keys():
-                if name.startswith(db):
-                    name = name.replace(db, NEF_CATEGORIES_REMOVEPREFIX[db], 1)
-                    break
+            return _removeCategoryPrefix(name)
         return name
 
     def _insertPrefix(self, name):
         if self._hidePrefix:
-            for db in NEF_CATEGORIES_INSERTPREFIX.keys():
-                if name.startswith(db):
-                    name = name.replace(db, NEF_CATEGORIES_INSERTPREFIX[db], 1)
-                    break
+            return _insertCategoryPrefix(name)
         return name
 
     @el.ErrorLog(errorCode=el.NEFERROR_BADLISTTYPE)
     def _getListType(self, _listType):
         # return a list of '_listType' from the saveFrame,
         # used with nefCategory routines below
-        if self._nefDict and isinstance(self._nefDict, OrderedDict):
-            sfList = [self._nefDict[db] for db in self._nefDict.keys() if _listType in db]
-            sfList = [self._namedToNefDict(sf) for sf in sfList]
+        if self._isLoaded and self._nefDict:
+            sfList = [self._namedToNefDict(sf) for db, sf in self._nefDict.items() if _listType in db]
 
             # if there is only one item then return it, otherwise return the list
             if len(sfList) > 1:
@@ -738,7 +837,7 @@ class NefImporter(el.ErrorLog):
         nefChem = 'nef_chemical_shift_list_1'
 
         self._nefDict[nefNmr] = StarIo.NmrDataBlock()
-        self._nefDict[nefNmr].update({k: '' for k in MD_REQUIRED_FIELDS})
+        self._nefDict[nefNmr].update(dict.fromkeys(MD_REQUIRED_FIELDS, ''))
         self._nefDict[nefNmr]['sf_category'] = 'nef_nmr_meta_data'
         self._nefDict[nefNmr]['sf_framecode'] = 'nef_nmr_meta_data'
         self._nefDict[nefNmr]['format_name'] = 'Nmr_Exchange_Format'
@@ -747,7 +846,7 @@ class NefImporter(el.ErrorLog):
         self._nefDict[nefNmr]['program_version'] = self.programVersion
 
         self._nefDict[nefMol] = StarIo.NmrDataBlock()
-        self._nefDict[nefMol].update({k: '' for k in MS_REQUIRED_FIELDS})
+        self._nefDict[nefMol].update(dict.fromkeys(MS_REQUIRED_FIELDS, ''))
         self._nefDict[nefMol]['sf_category'] = 'nef_molecular_system'
         self._nefDict[nefMol]['sf_framecode'] = 'nef_molecular_system'
         for l in MS_REQUIRED_LOOPS:
@@ -769,7 +868,7 @@ class NefImporter(el.ErrorLog):
 
         self._nefDict[name] = StarIo.NmrSaveFrame()
         if required_fields is not None:
-            self._nefDict[name].update({k: '' for k in required_fields})
+            self._nefDict[name].update(dict.fromkeys(required_fields, ''))
             self._nefDict[name]['sf_category'] = category
             self._nefDict[name]['sf_framecode'] = name
         if required_loops is not None:
@@ -880,21 +979,29 @@ class NefImporter(el.ErrorLog):
         return self._nefDict.toString()
 
     @el.ErrorLog(errorCode=el.NEFERROR_BADFROMSTRING)
-    def fromString(self, text, mode='standard'):
+    def fromString(self, text, mode='standard', validate=False):
         # set the Nef from the contents of the string, opposite of toString
+        # validate the contents if validate is True
         dataExtent = StarIo.parseNef(text=text, mode=mode)
         if dataExtent:
-            dbs = [dataExtent[db] for db in dataExtent.keys()]
+            dbs = list(dataExtent.values())
             if dbs:
                 self._nefDict = dbs[0]
+                self._isLoaded = True
+                if validate:
+                    self._doValidate()
+                else:
+                    self._clearValidation()
         else:
             self._logError(errorCode=el.NEFERROR_BADFROMSTRING)
             self._nefDict = {}
+            self._isLoaded = False
 
     @el.ErrorLog(errorCode=el.NEFERROR_ERRORLOADINGFILE)
-    def loadFile(self, fileName=None, mode='standard') -> StarIo.NmrDataBlock:
+    def loadFile(self, fileName=None, mode='standard', validate=True) -> StarIo.NmrDataBlock:
         """Load and parse Nef-file fileName
         :param fileName: path to a Nef-file
+        :param validate: validate the contents against the validation dictionary
         :return a NmrDataBlock instance
         """
         if not isinstance(fileName, (str, Path)):
@@ -911,14 +1018,19 @@ class NefImporter(el.ErrorLog):
         if len(_dataBlocks) > 1:
             raise RuntimeError('More than one datablock in a NEF file is not allowed.  Using the first and discarding the rest.\n')
         self._nefDict = _dataBlocks[0]
+        self._isLoaded = True
         self._path = fileName
-        self._doValidate()
+        if validate:
+            self._doValidate()
+        else:
+            self._clearValidation()
         return self.data
 
     @el.ErrorLog(errorCode=el.NEFERROR_ERRORLOADINGFILE)
-    def loadText(self, text, mode='standard') -> StarIo.NmrDataBlock:
+    def loadText(self, text, mode='standard', validate=True) -> StarIo.NmrDataBlock:
         """Load and parse Nef-formatted text
         :param text: Nef-formatted text
+        :param validate: validate the contents against the validation dictionary
         :return a NmrDataBlock instance
         """
         nefDataExtent = StarIo.parseNef(text=text, mode=mode)
@@ -926,8 +1038,12 @@ class NefImporter(el.ErrorLog):
         if len(_dataBlocks) > 1:
             raise RuntimeError('More than one datablock in a NEF file is not allowed.  Using the first and discarding the rest.\n')
         self._nefDict = _dataBlocks[0]
+        self._isLoaded = True
         self._path = 'loadedFromText'
-        self._doValidate()
+        if validate:
+            self._doValidate()
+        else:
+            self._clearValidation()
 
         return self.data
 
@@ -941,7 +1057,25 @@ class NefImporter(el.ErrorLog):
     @el.ErrorLog(errorCode=el.NEFERROR_BADCATEGORIES)
     def getCategories(self):
         # return a list of the categories available in a Nef file
-        return tuple([self._removePrefix(nm[0]) for nm in NEF_CATEGORIES])
+        return _CATEGORIES_HIDDEN if self._hidePrefix else _CATEGORIES_VISIBLE
+
+    def _getSaveFrameNamesAll(self):
+        return tuple(self._removePrefix(db) for db, sf in self._nefDict.items()
+                     if isinstance(sf, StarIo.NmrSaveFrame))
+
+    def _getSaveFrameNamesNef(self):
+        return tuple(self._removePrefix(db) for db, sf in self._nefDict.items()
+                     if db and db.startswith(NEF_PREFIX) and isinstance(sf, StarIo.NmrSaveFrame))
+
+    def _getSaveFrameNamesOther(self):
+        return tuple(db for db, sf in self._nefDict.items()
+                     if db and not db.startswith(NEF_PREFIX) and isinstance(sf, StarIo.NmrSaveFrame))
+
+    # one specialised method for each returnType, any other returnType returns all names
+    _SAVEFRAMENAMES_BY_RETURNTYPE = {NEF_RETURNALL  : _getSaveFrameNamesAll,
+                                     NEF_RETURNNEF  : _getSaveFrameNamesNef,
+                                     NEF_RETURNOTHER: _getSaveFrameNamesOther,
+                                     }
 
     @el.ErrorLog(errorCode=el.NEFERROR_SAVEFRAMEDOESNOTEXIST)
     def getSaveFrameNames(self, returnType=NEF_RETURNALL):
@@ -949,17 +1083,8 @@ class NefImporter(el.ErrorLog):
         if not self._nefDict:
             return ()
 
-        names = [db for db in self._nefDict
-                 if isinstance(self._nefDict[db], StarIo.NmrSaveFrame)]
-
-        if returnType == NEF_RETURNNEF:
-            names = [self._removePrefix(nm) for nm in names if nm and nm.startswith(NEF_PREFIX)]
-        elif returnType == NEF_RETURNOTHER:
-            names = [nm for nm in names if nm and not nm.startswith(NEF_PREFIX)]
-        else:
-            names = [self._removePrefix(nm) for nm in names]
-
-        return tuple(names)
+        getNames = self._SAVEFRAMENAMES_BY_RETURNTYPE.get(returnType, NefImporter._getSaveFrameNamesAll)
+        return getNames(self)
 
     @el.ErrorLog(errorCode=el.NEFERROR_SAVEFRAMEDOESNOTEXIST)
     def hasSaveFrame(self, name):
@@ -996,24 +1121,20 @@ class NefImporter(el.ErrorLog):
             saveFrame.name = newSaveFrameName
             saveFrame['sf_framecode'] = newSaveFrameName
 
-            data = [(k, val) for k, val in self._nefDict.items()]
-            for ii, (k, val) in enumerate(data):
-                if val == saveFrame:
-                    data[ii] = (newSaveFrameName, val)
-                    # should only be one
-                    break
-            newData = OrderedDict((k, val) for k, val in data)
-            self._nefDict.clear()
-            self._nefDict.update(newData)
+            # replace the key in-place, only the saveFrames after the renamed one need re-inserting to keep the order
+            keys = list(self._nefDict)
+            following = keys[keys.index(name) + 1:]
+            self._nefDict[newSaveFrameName] = self._nefDict.pop(name)
+            for key in following:
+                self._nefDict[key] = self._nefDict.pop(key)
 
             if saveFrame.get('name'):
                 saveFrame['name'] = newName
 
     @el.ErrorLog(errorCode=el.NEFERROR_READATTRIBUTENAMES)
     def getAttributeNames(self):
-        names = [self._removePrefix(db) for db in self._nefDict.keys()
-                 if not isinstance(self._nefDict[db], StarIo.NmrSaveFrame)]
-        return tuple(names)
+        return tuple(self._removePrefix(db) for db, val in self._nefDict.items()
+                     if not isinstance(val, StarIo.NmrSaveFrame))
 
     @el.ErrorLog(errorCode=el.NEFERROR_READATTRIBUTE)
     def getAttribute(self, name):
@@ -1061,7 +1182,7 @@ class NefImporter(el.ErrorLog):
         self._reader = reader
 
     def _importNef(self, project, *args, **kwds):
-        if hasattr(self, '_reader'):
+        if self._reader is not None:
             return self._reader(project, *args, **kwds)
 
     def _attachVerifier(self, verifier):
@@ -1070,7 +1191,7 @@ class NefImporter(el.ErrorLog):
         self._verifier = verifier
 
     def _verifyNef(self, project, *args, **kwds):
-        if hasattr(self, '_verifier'):
+        if self._verifier is not None:
             return self._verifier(project, *args, **kwds)
 
     def _attachContent(self, content):
@@ -1079,17 +1200,17 @@ class NefImporter(el.ErrorLog):
         self._content = content
 
     def _contentNef(self, project, *args, **kwds):
-        if hasattr(self, '_content'):
+        if self._content is not None:
             return self._content(project, *args, **kwds)
 
     def _attachClear(self, clr):
         """attach a clear/reset method
         """
-        self._clearNef = clr
+        self._clear = clr
 
     def _clearNef(self, project, *args, **kwds):
-        if hasattr(self, '_clearNef'):
-            return self._clearNef(project, *args, **kwds)
+        if self._clear is not None:
+            return self._clear(project, *args, **kwds)
 
     def __str__(self):
         return '<%s: errorLogging=%r; path=%s>' % (self.__class__.__name__, self._loggingMode, self._path)
@@ -1121,10 +1242,7 @@ class NefDict(StarIo.NmrSaveFrame, el.ErrorLog):
         :return <name>:
         """
         if self._hidePrefix:
-            for db in NEF_CATEGORIES_REMOVEPREFIX.keys():
-                if name.startswith(db):
-                    name = name.replace(db, NEF_CATEGORIES_REMOVEPREFIX[db], 1)
-                    break
+            return _removeCategoryPrefix(name)
         return name
 
     def _insertPrefix(self, name):
@@ -1134,10 +1252,7 @@ class NefDict(StarIo.NmrSaveFrame, el.ErrorLog):
         :return nef_<name>:
         """
         if self._hidePrefix:
-            for db in NEF_CATEGORIES_INSERTPREFIX.keys():
-                if name.startswith(db):
-                    name = name.replace(db, NEF_CATEGORIES_INSERTPREFIX[db], 1)
-                    break
+            return _insertCategoryPrefix(name)
         return name
 
     @el.ErrorLog(errorCode=el.NEFERROR_BADKEYS)
@@ -1147,10 +1262,7 @@ class NefDict(StarIo.NmrSaveFrame, el.ErrorLog):
         :param frame:
         :return orderedDict:
         """
-        newItem = OrderedDict()
-        for ky in frame.keys():
-            newItem[ky] = frame[ky]
-        return newItem
+        return OrderedDict(frame.items())
 
     @el.ErrorLog(errorCode=el.NEFERROR_BADTABLENAMES)
     def getTableNames(self):
@@ -1158,8 +1270,9 @@ class NefDict(StarIo.NmrSaveFrame, el.ErrorLog):
         Return list of attributes in the saveFrame
         :return list or None:
         """
-        return tuple([self._removePrefix(db) for db in self._nefFrame.keys()
-                      if isinstance(self._nefFrame[db], StarIo.NmrLoop)])
+        # NmrLoop has no subclasses, so an exact type test is sufficient
+        return tuple(self._removePrefix(db) for db, val in self._nefFrame.items()
+                     if type(val) is StarIo.NmrLoop)
 
     @el.ErrorLog(errorCode=el.NEFERROR_GENERICGETTABLEERROR)
     def getTable(self, name=None, asPandas=False):
@@ -1174,14 +1287,11 @@ class NefDict(StarIo.NmrSaveFrame, el.ErrorLog):
         # return table 'name' if exists else None
         thisFrame = None
         if name:
-            if name in self._nefFrame:
-                thisFrame = self._nefFrame[name]
-            else:
-                # table not found
-                name = self._insertPrefix(name)
-                if name in self._nefFrame:
-                    thisFrame = self._nefFrame[name]
-                else:
+            thisFrame = self._nefFrame.get(name, _MISSING)
+            if thisFrame is _MISSING:
+                # table not found, try with the prefix
+                thisFrame = self._nefFrame.get(self._insertPrefix(name), _MISSING)
+                if thisFrame is _MISSING:
                     self._logError(errorCode=el.NEFERROR_TABLEDOESNOTEXIST)
                     return None
         else:
@@ -1229,13 +1339,21 @@ class NefDict(StarIo.NmrSaveFrame, el.ErrorLog):
         Convert the saveFrame to a Pandas dataFrame
         :return dataFrame or None on error:
         """
-        try:
-            import pandas as pd
+        pd = _getPandas()
+        if not pd:
+            raise RuntimeError('pandas is required to return a table as a dataFrame')
 
-            df = pd.DataFrame(data=sf.data, columns=sf.columns)
-            df.replace({'.': np.NAN, 'true': True, 'false': False}, inplace=True)
-            return df
-        except:
+        try:
+            columns = sf.columns
+            if not sf.data:
+                return pd.DataFrame(columns=columns)
+
+            # replace the Nef null/boolean strings in a single object array, rather than df.replace on every cell
+            values = np.array([[row.get(col, np.nan) for col in columns] for row in sf.data], dtype=object)
+            for nefValue, newValue in _PANDAS_VALUE_MAP.items():
+                values[values == nefValue] = newValue
+            return pd.DataFrame(data=values, columns=columns).infer_objects()
+        except (ValueError, TypeError):
             return None
 
     @el.ErrorLog(errorCode=el.NEFERROR_READATTRIBUTENAMES)
@@ -1244,8 +1362,8 @@ class NefDict(StarIo.NmrSaveFrame, el.ErrorLog):
         Return list of attributes in the saveFrame
         :return list or None:
         """
-        return tuple([self._removePrefix(db) for db in self._nefFrame.keys()
-                      if not isinstance(self._nefFrame[db], StarIo.NmrLoop)])
+        return tuple(self._removePrefix(db) for db, val in self._nefFrame.items()
+                     if type(val) is not StarIo.NmrLoop)
 
     @el.ErrorLog(errorCode=el.NEFERROR_READATTRIBUTE)
     def getAttribute(self, name):
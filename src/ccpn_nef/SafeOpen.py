@@ -33,18 +33,75 @@ import sys
 from contextlib import contextmanager
 
 
-def _iter_incrementing_file_names(path):
+def _iter_incrementing_file_names(path, start=0):
     """
     Iterate incrementing file names. Start with path and add '(n)' before the
     extension, where n starts at 1 and increases.
 
     :param path: Some path
+    :param start: first n to yield; 0 yields path first
     :return: An iterator.
     """
-    yield path
+    if not start:
+        yield path
     prefix, ext = os.path.splitext(path)
-    for i in itertools.count(start=1, step=1):
-        yield prefix + '({0})'.format(i) + ext
+    for i in itertools.count(start=max(start, 1), step=1):
+        yield f'{prefix}({i}){ext}'
+
+
+def _find_first_available(path):
+    """
+    Find the likely first free n for path, probing n = 1, 2, 4, 8, ... until a
+    filename does not exist and then bisecting the last interval.
+    Only requires O(log n) checks when many numbered files already exist,
+    gaps in the existing numbering may be skipped.
+
+    :param path: Some path
+    :return: n to start from; 0 if path itself does not exist.
+    """
+    if not os.path.exists(path):
+        return 0
+
+    prefix, ext = os.path.splitext(path)
+
+    def _exists(i):
+        return os.path.exists(f'{prefix}({i}){ext}')
+
+    # lo always exists, hi does not
+    lo, hi = 0, 1
+    while _exists(hi):
+        lo, hi = hi, hi * 2
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if _exists(mid):
+            lo = mid
+        else:
+            hi = mid
+    return hi
+
+
+def _open_first_available(path, mode):
+    """
+    Create and open the first filename from path that does not already exist.
+
+    :param path: filepath and filename.
+    :param mode: open flags
+    :return: tuple(file descriptor, filename)
+    """
+    flags = os.O_CREAT | os.O_EXCL | os.O_WRONLY
+
+    if 'b' in mode and sys.platform == 'win32' and hasattr(os, 'O_BINARY'):
+        flags |= os.O_BINARY
+
+    # repeat over filenames with iterating number, starting from the first apparently free name
+    # the exclusive open still handles a file created in the meantime
+    for filename in _iter_incrementing_file_names(path, start=_find_first_available(path)):
+        try:
+            return os.open(filename, flags), filename
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+            # force repeat of the loop if file exists (file not opened)
 
 
 @contextmanager
@@ -52,7 +109,7 @@ def safeOpen(path, mode):
     """
     Open path, but if it already exists, add '(n)' before the extension,
     where n is the first number found such that the file does not already
-    exist.
+    exist (following the existing (1), (2), ... sequence).
     Returns an open file handle.
 
     Usage:  with safeOpen(path, [options]) as (fd, safeFileName):
@@ -65,52 +122,23 @@ def safeOpen(path, mode):
     :param mode: open flags
     :return: Open file handle and new fileName
     """
-    flags = os.O_CREAT | os.O_EXCL | os.O_WRONLY
-
-    if 'b' in mode and sys.platform.system() == 'Windows' and hasattr(os, 'O_BINARY'):
-        flags |= os.O_BINARY
-
-    # repeat over filenames with iterating number
-    for filename in _iter_incrementing_file_names(path):
-        try:
-            file_handle = os.open(filename, flags)
-        except OSError as e:
-            if e.errno == errno.EEXIST:
-                # force repeat of the loop if file exists (file not opened)
-                pass
-            else:
-                raise
-        else:
-            # yield the file descriptor and new, safe filename
-            with os.fdopen(file_handle, mode) as fd:
-                yield fd, filename
+    file_handle, filename = _open_first_available(path, mode)
 
-            # ...and exit
-            return
+    # yield the file descriptor and new, safe filename
+    with os.fdopen(file_handle, mode) as fd:
+        yield fd, filename
 
 
 def getSafeFilename(path, mode='w'):
     """Get the first safe filename from the given path
+    The (empty) file is created to reserve the name.
 
     :param path: filepath and filename.
     :param mode: open flags
-    :return: Open file handle and new fileName
+    :return: new fileName
     """
-    flags = os.O_CREAT | os.O_EXCL | os.O_WRONLY
-
-    if 'b' in mode and sys.platform.system() == 'Windows' and hasattr(os, 'O_BINARY'):
-        flags |= os.O_BINARY
+    file_handle, filename = _open_first_available(path, mode)
+    os.close(file_handle)
 
-    # repeat over filenames with iterating number
-    for filename in _iter_incrementing_file_names(path):
-        try:
-            file_handle = os.open(filename, flags)
-        except OSError as e:
-            if e.errno == errno.EEXIST:
-                # force repeat of the loop if file exists (file not opened)
-                pass
-            else:
-                raise
-        else:
-            # return the new filename
-            return filename
+    # return the new filename
+    return filename
@@ -28,6 +28,8 @@ __date__ = "$Date: 2017-04-07 10:28:41 +0000 (Fri, April 07, 2017) $"
 #=========================================================================================
 
 import sys
+from functools import lru_cache
+from operator import itemgetter
 
 from . import GenericStarParser
 from . import StarIo
@@ -36,6 +38,28 @@ from . import StarIo
 INFOPREFIX = 'INFO: '
 
 
+@lru_cache(maxsize=None)
+def _splitTag(tag):
+    """Split tag '_category.name' at the first '.' into ('_category', 'name'),
+    the same tags are split repeatedly while converting a specification
+    """
+    head, sep, tail = tag.partition('.')
+    return (head, tail) if sep else (head,)
+
+
+_KEYTAG_SEPARATOR = '\x00'
+
+
+def _keyTag(category, name):
+    """Return the single (interned) string used to store category/name pairs in CifDicConverter.keyTags
+    """
+    return sys.intern(f'{category}{_KEYTAG_SEPARATOR}{name}')
+
+
+# is_mandatory value for the mandatory_code of categories and items, anything but 'yes' is False
+_MANDATORY = {'yes': True}
+
+
 # TODO, This is a DRAFT only - not used and not currently functional.
 # May be upgraded later, for specification-aware NEF I/O
 
@@ -49,6 +73,20 @@ def getCcpnSpecification(filePath):
     return converter.convertToNef()
 
 
+# tags handled by the CifDicConverter extract methods, any others are reported
+_SAVEFRAME_EXPECTED_TAGS = frozenset(('_category.description', '_category.id', '_category.mandatory_code',
+                                      '_category_group.id', '_category_key.name', '_category_examples.case',
+                                      '_category_examples.detail',))
+_LOOP_EXPECTED_TAGS = frozenset(('_category.description', '_category.id', '_category.parent_category_id',
+                                 '_category.mandatory_code', '_category_group.id', '_category_key.name',
+                                 '_category_examples.case', '_category_examples.detail',))
+
+# columns of the nef_loop and nef_item loops in each specification saveframe
+_NEF_LOOP_COLUMNS = ('category', 'is_mandatory', 'description', 'example')
+_NEF_ITEM_COLUMNS = ('name', 'loop_category', 'type_code', 'is_mandatory', 'is_key', 'example_1', 'example_2',
+                     'description')
+
+
 class CifDicConverter(object):
     """Converts mmcif .dic file, with program-specific additions datablocks
     into a single NEF data structure, containing:
@@ -89,6 +127,10 @@ class CifDicConverter(object):
            (if empty it belongs directly inside the saveframe)
         """
 
+    # attributes are fixed and read repeatedly while converting
+    __slots__ = ('specification', 'additionalBlocks', 'keyTags', 'result', 'skipExamples',
+                 '_category2SaveFrame', '_keyNames', '_logFunc')
+
     def __init__(self, inputText, skipExamples=True, additionalBlocks=(), logger=None):
         self.specification = GenericStarParser.parse(inputText)
         self.additionalBlocks = additionalBlocks
@@ -96,6 +138,8 @@ class CifDicConverter(object):
         self.result = None
         self.skipExamples = skipExamples
         self._category2SaveFrame = {}
+        # _category_key.name values by category, read once while sorting the saveframes by category
+        self._keyNames = {}
         if logger and not callable(logger):
             raise TypeError('logger must be callable')
 
@@ -108,9 +152,33 @@ class CifDicConverter(object):
             return
 
         try:
-            self._logFunc('{}{}'.format(INFOPREFIX, ' '.join([str(arg) for arg in args])))
+            self._logFunc(f"{INFOPREFIX}{' '.join(map(str, args))}")
         except Exception as es:
-            self._logFunc('{}>>> Error during logging: {}'.format(INFOPREFIX, str(es)))
+            self._logFunc(f'{INFOPREFIX}>>> Error during logging: {es}')
+
+    def _getKeyNames(self, inputSaveFrame):
+        """Return the _category_key.name values for the saveframe, reusing those read by extractByCategories
+        """
+        keyNames = self._keyNames.get(inputSaveFrame['_category.id'])
+        if keyNames is None:
+            keyNames = inputSaveFrame.columnValues('_category_key.name')
+        return keyNames
+
+    def _logExamples(self, inputSaveFrame, examples=None):
+        """Log the detail and case of each _category_examples row
+        """
+        details = inputSaveFrame.columnValues('_category_examples.detail')
+        if examples is None:
+            examples = inputSaveFrame.columnValues('_category_examples.case')
+        if details is not None and examples is not None and len(details) == len(examples):
+            for detail, case in zip(details, examples):
+                self._logging(detail, case)
+        else:
+            # detail and case are not matched columns, go through the rows
+            data = inputSaveFrame.multiColumnValues(('_category_examples.detail',
+                                                     '_category_examples.case',))
+            for dd in data:
+                self._logging(dd['_category_examples.detail'], dd['_category_examples.case'])
 
     def convertToNef(self):
         """Convert RCSB .cif file into a nef specification summary file
@@ -118,7 +186,7 @@ class CifDicConverter(object):
         # NOTE - this assumes a single datablock.
 
         # set up
-        rcsbDataBlock = list(self.specification.values())[0]
+        rcsbDataBlock = next(iter(self.specification.values()))
         result = self.result = StarIo.NmrDataBlock(name='specification')
 
         # make specific content saveframes
@@ -132,13 +200,13 @@ class CifDicConverter(object):
                              % repr(self.additionalBlocks[ii - 1]))
 
         for dataBlock in dataBlocks:
-            toSaveFrames, toLoops, toItems = extractByCategories(dataBlock)
+            toSaveFrames, toLoops, toItems = extractByCategories(dataBlock, keyNames=self._keyNames)
             self._logging('%s SAVEFRAMES' % len(toSaveFrames))
             for xx in toSaveFrames:
                 self.extractSaveFrameDescription(xx)
             self._logging('saveframes are', list(self.result.keys()))
             self._logging('%s LOOPS' % len(toLoops))
-            for xx in toLoops:
+            for xx in _sortByParentDepth(toLoops):
                 self.extractLoopDescription(xx)
             self._logging('%s ITEMS' % len(toItems))
             for xx in toItems:
@@ -148,9 +216,10 @@ class CifDicConverter(object):
         if self.keyTags:
             self._logging("Error. unused keys:")
             for tt in self.keyTags:
-                self._logging(tt)
+                self._logging(tuple(tt.split(_KEYTAG_SEPARATOR)))
             self._logging()
 
+        self._keyNames.clear()
         #
         return result
 
@@ -173,180 +242,164 @@ class CifDicConverter(object):
         for row in typeLoop.data:
             detail = row['detail'].strip()
             if detail:
-                ll = detail.splitlines()
-                row['detail'] = '\n'.join(x.strip() for x in ll) + '\n'
+                row['detail'] = '\n'.join(map(str.strip, detail.splitlines())) + '\n'
         #
         return saveFrame
 
     def extractSaveFrameDescription(self, inputSaveFrame):
         """Extract saveframe description
         """
-        expectedTags = ('_category.description', '_category.id', '_category.mandatory_code',
-                        '_category_group.id', '_category_key.name', '_category_examples.case',
-                        '_category_examples.detail',)
-
         metaCategory = 'nef_saveframe'
         category = inputSaveFrame['_category.id']
         name = '%s_%s' % (metaCategory, category)
         saveFrame = self.result.newSaveFrame(name, category=metaCategory)
-        self._category2SaveFrame[category] = saveFrame
+        self._category2SaveFrame[sys.intern(str(category))] = saveFrame
         saveFrame.addItem('is_mandatory',
-                          inputSaveFrame.get('_category.mandatory_code') == 'yes')
+                          _MANDATORY.get(inputSaveFrame.get('_category.mandatory_code'), False))
 
         saveFrame.addItem('description', inputSaveFrame.get('_category.description'))
 
-        data = inputSaveFrame.multiColumnValues(('_category_examples.detail',
-                                                 '_category_examples.case',))
-
-        examples = [x['_category_examples.case'] for x in data]
-        if len(examples) == 1:
+        if self.skipExamples:
+            # only the number of examples is needed
+            examples = None
+            numExamples = inputSaveFrame.countValues('_category_examples.case')
+        else:
+            examples = inputSaveFrame.columnValues('_category_examples.case') or []
+            numExamples = len(examples)
+        if numExamples == 1:
             if self.skipExamples:
                 example = 'omitted'
             else:
                 example = examples[0]
             saveFrame.addItem('example', example)
-        elif examples:
+        elif numExamples:
             self._logging("Multiple examples for %s" % name)
-            for dd in data:
-                self._logging(dd['_category_examples.detail'], dd['_category_examples.case'])
+            self._logExamples(inputSaveFrame, examples)
 
         # Get keytags for later use
-        keyNamesData = inputSaveFrame.multiColumnValues(('_category_key.name',))
-        for dd in keyNamesData:
-            tt = list(dd.values())[0].split('.', 1)
-            self.keyTags[(tt[0][1:], tt[1])] = name
+        keyTags = self.keyTags
+        for keyName in self._getKeyNames(inputSaveFrame):
+            tt = _splitTag(keyName)
+            keyTags[_keyTag(tt[0][1:], tt[1])] = name
 
         # Check for untreated tags
-        for tag in inputSaveFrame:
-            if tag not in expectedTags:
-                self._logging("Unexpected item in %s:" % inputSaveFrame['_category.id'], tag,
-                              inputSaveFrame.get(tag))
+        for tag, value in inputSaveFrame.items():
+            if tag not in _SAVEFRAME_EXPECTED_TAGS:
+                self._logging("Unexpected item in %s:" % category, tag, value)
 
     def extractLoopDescription(self, inputSaveFrame):
         """Extract loop description
         """
-        expectedTags = ('_category.description', '_category.id', '_category.parent_category_id',
-                        '_category.mandatory_code', '_category_group.id', '_category_key.name',
-                        '_category_examples.case', '_category_examples.detail',)
         name = inputSaveFrame['_category.id']
         parentCategory = inputSaveFrame.get('_category.parent_category_id')
+        category2SaveFrame = self._category2SaveFrame
         if parentCategory is None:
             self._logging("loop is missing _category.parent_category_id:", name)
         else:
 
             # NOTE:ED now need to search the previous categories for the container
-            parent = self._category2SaveFrame.get(parentCategory)
+            parent = category2SaveFrame.get(parentCategory)
             if parent is None:
                 self._logging("loop is missing parent saveFrame:", name, parentCategory,
-                              list(self._category2SaveFrame.keys()))
+                              "(%d categories known)" % len(category2SaveFrame))
             else:
-                self._category2SaveFrame[name] = parent
+                category2SaveFrame[sys.intern(str(name))] = parent
 
                 # get example
-                data = inputSaveFrame.multiColumnValues(('_category_examples.detail',
-                                                         '_category_examples.case',))
-                examples = [x['_category_examples.case'] for x in data]
-                if examples:
+                if inputSaveFrame.countValues('_category_examples.case'):
                     example = 'omitted'
                     if not self.skipExamples:
+                        examples = inputSaveFrame.columnValues('_category_examples.case')
                         if len(examples) == 1:
                             example = examples[0]
                         else:
                             self._logging("Multiple examples for %s" % name)
-                            for dd in data:
-                                self._logging(dd['_category_examples.detail'], dd['_category_examples.case'])
+                            self._logExamples(inputSaveFrame, examples)
                 else:
                     example = None
 
                 # make loop
                 loop = parent.get('nef_loop')
                 if loop is None:
-                    loop = parent.newLoop('nef_loop', ('category', 'is_mandatory', 'description', 'example'))
-                loop.newRow(dict(
-                        category=name,
-                        is_mandatory=inputSaveFrame.get('_category.mandatory_code') == 'yes',
-                        description=inputSaveFrame.get('_category.description'),
-                        example=example)
-                        )
+                    loop = parent.newLoop('nef_loop', _NEF_LOOP_COLUMNS)
+                # values in _NEF_LOOP_COLUMNS order
+                loop.newRow((name,
+                             _MANDATORY.get(inputSaveFrame.get('_category.mandatory_code'), False),
+                             inputSaveFrame.get('_category.description'),
+                             example))
 
         # Get keytags for later use
-        keyNamesData = inputSaveFrame.multiColumnValues(('_category_key.name',))
-        for dd in keyNamesData:
-            tt = list(dd.values())[0].split('.', 1)
+        keyTags = self.keyTags
+        for keyName in self._getKeyNames(inputSaveFrame):
+            tt = _splitTag(keyName)
             if len(tt) != 2:
                 self._logging("key lacks internal '.'", parentCategory, name, tt)
-            self.keyTags[(tt[0][1:], tt[1])] = name
+            keyTags[_keyTag(tt[0][1:], tt[1])] = name
 
         # Check for untreated tags
-        for tag in inputSaveFrame:
-            if tag not in expectedTags:
-                self._logging("Unexpected item in %s:" % inputSaveFrame['_category.id'], tag,
-                              inputSaveFrame.get(tag))
+        for tag, value in inputSaveFrame.items():
+            if tag not in _LOOP_EXPECTED_TAGS:
+                self._logging("Unexpected item in %s:" % name, tag, value)
 
     def extractItemDescription(self, inputSaveFrame):
         """Extract item description
         """
-        expectedTags = ('_item_description.description', '_item.name', '_item.mandatory_code',
-                        '_item.category_id', '_item_type.code', '_item_examples.case',
-                        '_item_examples.detail',)
-
         # get data
-        name = inputSaveFrame.get('_item.name').split('.', 1)[1]
+        name = _splitTag(inputSaveFrame.get('_item.name'))[1]
         category = inputSaveFrame.get('_item.category_id')
-        isKey = (category, name) in self.keyTags
-        if isKey:
-            del self.keyTags[(category, name)]
+        isKey = self.keyTags.pop(_keyTag(category, name), None) is not None
         saveFrame = self._category2SaveFrame.get(category)
         if saveFrame is None:
-            raise ValueError("SaveFrame named %s not found in list: %s"
-                             % (category, list(self._category2SaveFrame.keys())))
+            raise ValueError("SaveFrame named %s not found among %d known categories"
+                             % (category, len(self._category2SaveFrame)))
         if saveFrame.name == 'nef_saveframe_' + category:
             # item lives in a saveframe, not a loop
             category = None
-        isMandatory = inputSaveFrame.get('_item.mandatory_code') == 'yes'
+        isMandatory = _MANDATORY.get(inputSaveFrame.get('_item.mandatory_code'), False)
         description = inputSaveFrame.get('_item_description.description')
         typeCode = inputSaveFrame.get('_item_type.code')
 
         # get examples
-        data = inputSaveFrame.multiColumnValues(('_item_examples.detail',
-                                                 '_item_examples.case',))
-        examples = [x['_item_examples.case'] for x in data]
-        if len(examples) > 2:
+        examples = inputSaveFrame.columnValues('_item_examples.case') or []
+        numExamples = len(examples)
+        example1 = examples[0] if numExamples else None
+        example2 = examples[1] if numExamples > 1 else None
+        if numExamples > 2:
             self._logging("More than two examples for %s" % name)
             # for dd in data:
             #     self._logging(dd['_item_examples.detail'], dd['_item_examples.case'])
-        while len(examples) < 2:
-            examples.append(None)
 
         # Add item to loop, making it if necessary
         specificationLoop = saveFrame.get('nef_item')
         if specificationLoop is None:
-            specificationLoop = saveFrame.newLoop('nef_item', ('name', 'loop_category', 'type_code',
-                                                               'is_mandatory', 'is_key', 'example_1', 'example_2',
-                                                               'description'))
+            specificationLoop = saveFrame.newLoop('nef_item', _NEF_ITEM_COLUMNS)
 
-        specificationLoop.newRow(dict(name=name, loop_category=category,
-                                      type_code=typeCode, is_mandatory=isMandatory, is_key=isKey,
-                                      example_1=examples[0], example_2=examples[1],
-                                      description=description))
+        # values in _NEF_ITEM_COLUMNS order
+        specificationLoop.newRow((name, category, typeCode, isMandatory, isKey,
+                                  example1, example2, description))
 
 
-def extractByCategories(rcsbDataBlock):
+def extractByCategories(rcsbDataBlock, keyNames=None):
     """Get saveFrames describing SaveFrames, Loops, and items, respectively
+    If keyNames is a dict, the _category_key.name values of each category are stored in it by category
     """
     toSaveFrames = []
     toLoops = []
     toItems = []
-    for tag, saveFrame in rcsbDataBlock.items():
+    # saveFrames are the only values stored under 'save_' tags, so test the type rather than the tag
+    saveFrameType = GenericStarParser.SaveFrame
+    for saveFrame in rcsbDataBlock.values():
 
-        if tag.startswith('save_'):
+        if isinstance(saveFrame, saveFrameType):
             category = saveFrame.get('_category.id')
             if category is None:
                 toItems.append(saveFrame)
             else:
-                saveFrameCodeTag = '_%s.sf_framecode' % category
-                keyNamesData = saveFrame.multiColumnValues(('_category_key.name',))
-                if any(x for x in keyNamesData if list(x.values())[0] == saveFrameCodeTag):
+                saveFrameCodeTag = f'_{category}.sf_framecode'
+                categoryKeyNames = saveFrame.columnValues('_category_key.name')
+                if keyNames is not None:
+                    keyNames[category] = categoryKeyNames
+                if saveFrameCodeTag in categoryKeyNames:
                     toSaveFrames.append(saveFrame)
                 else:
                     toLoops.append(saveFrame)
@@ -354,30 +407,73 @@ def extractByCategories(rcsbDataBlock):
     return (toSaveFrames, toLoops, toItems)
 
 
-def transferLoop(genericContainer, saveFrame, inputTags):
-    """Transfer category.tag_x, ... to loop named category with tags tag_x etc.
+def _sortByParentDepth(loopSaveFrames):
+    """Return the loop-describing saveFrames ordered so that a loop nested in another loop
+    follows its parent; the original order is kept otherwise
+    """
+    parents = {sf.get('_category.id'): sf.get('_category.parent_category_id') for sf in loopSaveFrames}
+    depths = {}
+
+    def _depth(category):
+        # number of loop ancestors, guarding against cycles
+        depth = 0
+        seen = {category}
+        parent = parents.get(category)
+        while parent in parents and parent not in seen:
+            if parent in depths:
+                depth += depths[parent] + 1
+                break
+            seen.add(parent)
+            depth += 1
+            parent = parents[parent]
+        depths[category] = depth
+        return depth
+
+    return sorted(loopSaveFrames, key=lambda sf: _depth(sf.get('_category.id')))
+
+
+@lru_cache(maxsize=None)
+def _planTags(inputTags):
+    """Check that tags (a tuple) are all of the form _xyz.abc with the same prefix
+    and return (category, columns), callers pass the same constant tuples each time
     """
     set1 = set()
     columns = []
     for tag in inputTags:
-        tt = tag.split('.')
-        if len(tt) == 2 and tt[0][0] == '_':
-            columns.append(tt[1])
-            set1.add(tt[0][1:])
+        head, sep, tail = tag.partition('.')
+        if sep and '.' not in tail and head[:1] == '_':
+            columns.append(tail)
+            set1.add(head[1:])
         else:
-            raise ValueError("Tag %s is not of form _xyz.abc")
+            raise ValueError("Tag %s is not of form _xyz.abc" % tag)
 
-    if len(set1) == 1:
-        category = set1.pop()
-        data = genericContainer.multiColumnValues(inputTags)
-        if data:
-            loop = saveFrame.newLoop(category, columns=columns)
+    if len(set1) != 1:
+        raise ValueError("tags have more than on prefix: %s" % sorted((set1)))
+    return set1.pop(), tuple(columns)
+
+
+def transferLoop(genericContainer, saveFrame, inputTags):
+    """Transfer category.tag_x, ... to loop named category with tags tag_x etc.
+    """
+    category, columns = _planTags(tuple(inputTags))
+
+    data = genericContainer.multiColumnValues(inputTags)
+    if data:
+        loop = saveFrame.newLoop(category, columns=columns)
+        if all(tag in data[0] for tag in inputTags):
+            # rows all share the same keys, so fetch each row's values in a single call
+            getter = itemgetter(*inputTags)
+            if len(inputTags) == 1:
+                for row in data:
+                    loop.newRow((getter(row),))
+            else:
+                for row in data:
+                    loop.newRow(getter(row))
+        else:
             for row in data:
                 loop.newRow(list(row.get(tag) for tag in inputTags))
 
-            return loop
-    else:
-        raise ValueError("tags have more than on prefix: %s" % sorted((set1)))
+        return loop
     #
     return None
 
@@ -64,7 +64,9 @@ __date__ = "$Date: 2017-04-07 10:28:41 +0000 (Fri, April 07, 2017) $"
 
 
 import keyword
-import os
+import re
+import string
+from functools import lru_cache
 
 from . import GenericStarParser
 
@@ -74,6 +76,11 @@ TRUESTRING = GenericStarParser.TRUESTRING
 FALSESTRING = GenericStarParser.FALSESTRING
 UNKNOWNSTRING = GenericStarParser.UNKNOWNSTRING
 UnquotedValue = GenericStarParser.UnquotedValue
+_MISSING = object()
+
+# Converted values of the special STAR values; parsed values are new UnquotedValue objects,
+# so they are looked up by (string) value rather than identity
+_SPECIAL_VALUES = {NULLSTRING: None, UNKNOWNSTRING: None, TRUESTRING: True, FALSESTRING: False}
 
 # Make target string (translator) for mapping, to work in Python 2 and 3 both
 # Unprintable characters map to '_', bytes above 128 map to '?'
@@ -83,14 +90,73 @@ ll[34] = ll[35] = ll[39] = '?'
 latin_1_to_framecode_translator = ''.join(ll)
 
 
+# The same mapping as a bytes.translate table; all its characters are ASCII
+_FRAMECODE_BYTES_TABLE = latin_1_to_framecode_translator.encode('ascii')
+
+# buffer size when reading star-files
+_READ_BUFFERING = 1 << 20
+
+
+def _commonDotPrefix(tags):
+    """Return the dot-terminated prefix (e.g. '_nef_sequence.') that all tags start with,
+    or None if there is none"""
+    if not tags:
+        return None
+    first = tags[0]
+    dot = first.find('.')
+    if dot < 0:
+        return None
+    prefix = first[:dot + 1]
+    return prefix if all(tag.startswith(prefix) for tag in tags) else None
+
+
+# characters that are not alphanumeric (as str.isalnum), replaced in invalid column names
+_NON_ALNUM_PATTERN = re.compile(r'[\W_]')
+
+# plain integers, converted without trying int()
+_INTEGER_PATTERN = re.compile(r'[-+]?[0-9]+\Z')
+# characters that a value accepted by int() or float() can start with, other than non-ASCII characters;
+# values starting with anything else are left as strings without trying the conversions
+_NUMBER_START = frozenset('0123456789+-.iInN' + string.whitespace)
+
+# tags ending in '_code' or '_name', or containing '_code_' or '_name_'
+_STRING_TAG_PATTERN = re.compile(r'_(?:code|name)(?:_|\Z)')
+
+
+@lru_cache(maxsize=4096)
+def _isStringTag(tag):
+    """True if values for tag are assumed to be strings and are not converted to numbers;
+    cached, as the same tags are tested for every value in a column"""
+    return _STRING_TAG_PATTERN.search(tag) is not None
+
+
+def _readStarFile(fileName, wrapInDataBlock=False):
+    """Read the text of a star-file in a single buffered read;
+    if wrapInDataBlock a missing DataBlock start is added"""
+    with open(fileName, buffering=_READ_BUFFERING) as fp:
+        text = fp.read()
+
+    # 'data_' is normally near the start of the file, so test it first
+    if wrapInDataBlock and 'data_' not in text and 'save_' in text:
+        text = "data_dummy \n\n" + text
+    return text
+
+
+def _convertDataExtent(dataExtent, fileType, mode):
+    """Convert parsed dataExtent to an NmrDataExtent;
+    in 'strict' mode the whole dataExtent is prevalidated before conversion starts,
+    otherwise each saveFrame is prevalidated as it is converted, in a single pass"""
+    converter = _StarDataConverter(dataExtent, fileType=fileType)
+    if mode == 'strict':
+        converter.preValidate()
+        return converter.convert()
+    return converter.convert(validate=True)
+
+
 def parseNmrStar(text, mode='standard'):
     """load NMRSTAR file"""
     dataExtent = GenericStarParser.parse(text, mode)
-    converter = _StarDataConverter(dataExtent)
-    converter.preValidate()
-    result = converter.convert()
-    #
-    return result
+    return _convertDataExtent(dataExtent, 'star', mode)
 
 
 def parseNmrStarFile(fileName, mode='standard', wrapInDataBlock=False):
@@ -100,56 +166,32 @@ def parseNmrStarFile(fileName, mode='standard', wrapInDataBlock=False):
     :param wrapInDataBlock: flag; if True a missing DataBlock start will be added
     :return NmrDataBlock instance
     """
-    with open(fileName) as fp:
-        text = fp.read()
-
-    if wrapInDataBlock and 'save_' in text and not 'data_' in text:
-        text = "data_dummy \n\n" + text
-
-    dataExtent = GenericStarParser.parse(text, mode)
-    converter = _StarDataConverter(dataExtent, fileType='star')
-    converter.preValidate()
-    result = converter.convert()
-    #
-    return result
+    # the file text is not kept once parsed, so it can be released before the conversion
+    dataExtent = GenericStarParser.parse(_readStarFile(fileName, wrapInDataBlock), mode)
+    return _convertDataExtent(dataExtent, 'star', mode)
 
 
 def parseNef(text, mode='standard'):
     """load NEF from string"""
 
     dataExtent = GenericStarParser.parse(text, mode)
-    converter = _StarDataConverter(dataExtent, fileType='nef')
-    converter.preValidate()
-    result = converter.convert()
-    #
-    return result
+    return _convertDataExtent(dataExtent, 'nef', mode)
 
 
 def parseNefFile(fileName, mode='standard', wrapInDataBlock=False):
     """parse NEF from file
 
     if wrapInDataBlock missing DataBlock start will be provided"""
-    with open(fileName) as fp:
-        text = fp.read()
-
-    if wrapInDataBlock and 'save_' in text and not 'data_' in text:
-        text = "data_dummy \n\n" + text
-    dataExtent = GenericStarParser.parse(text, mode)
-    converter = _StarDataConverter(dataExtent, fileType='nef')
-    converter.preValidate()
-    result = converter.convert()
-    #
-    return result
+    # the file text is not kept once parsed, so it can be released before the conversion
+    dataExtent = GenericStarParser.parse(_readStarFile(fileName, wrapInDataBlock), mode)
+    return _convertDataExtent(dataExtent, 'nef', mode)
 
 
+@lru_cache(maxsize=4096)
 def string2FramecodeString(text):
-    # Replace code points outside latin-1 range (more than one byte)  with '?'
-    result = text.encode('latin_1', 'replace').decode('latin_1')
-
-    # Translate string, using preset translator
-    result = result.translate(latin_1_to_framecode_translator)
-    #
-    return result
+    # Replace code points outside latin-1 range (more than one byte) with '?'
+    # and translate the bytes, using preset table; the result is pure ASCII
+    return text.encode('latin_1', 'replace').translate(_FRAMECODE_BYTES_TABLE).decode('ascii')
 
 
 class StarValidationError(ValueError):
@@ -171,7 +213,7 @@ class NmrDataExtent(GenericStarParser.DataExtent):
 class NmrLoop(GenericStarParser.Loop):
     """Loop for NMRSTAR/NEF object tree
 
-    The contents, self.data is a list of OrderedDicts matching the column names.
+    The contents, self.data is a list of (ordered) dicts matching the column names.
     rows can be modified or deleted from data, but adding new rows directly is likely to
     break - use the newRow function."""
 
@@ -223,7 +265,7 @@ class NmrDataBlock(GenericStarParser.DataBlock):
 
 
 class NmrLoopRow(GenericStarParser.LoopRow):
-    pass
+    __slots__ = ()
 
 
 class _StarDataConverter:
@@ -234,6 +276,9 @@ class _StarDataConverter:
 
     validFileTypes = ('nef', 'star')
 
+    __slots__ = ('specification', 'fileType', 'convertColumnNames', 'dataExtent', 'stack',
+                 '_saveFramePrefixes')
+
     def __init__(self, dataExtent, fileType='star',
                  specification=None, convertColumnNames=True):
 
@@ -254,6 +299,9 @@ class _StarDataConverter:
         # Stack of objects parsed, to give context for error messages
         self.stack = []
 
+        # Tag prefixes found by preValidateSaveFrame, by id of the saveFrame, for reuse by convertSaveFrame
+        self._saveFramePrefixes = {}
+
     def preValidate(self):
         self.stack = []
 
@@ -266,7 +314,10 @@ class _StarDataConverter:
             print(self._errorMessage('System error:'))
             raise
 
-    def convert(self):
+    def convert(self, validate=False):
+        """Convert the dataExtent.
+        If validate is True each saveFrame is prevalidated just before it is converted,
+        in a single pass, instead of calling preValidate first"""
 
         nmrDataExtent = NmrDataExtent(name=self.dataExtent.name)
 
@@ -274,7 +325,7 @@ class _StarDataConverter:
 
         try:
             for dataBlock in self.dataExtent.values():
-                newDataBlock = self.convertDataBlock(dataBlock)
+                newDataBlock = self.convertDataBlock(dataBlock, validate=validate)
                 nmrDataExtent.addItem(newDataBlock.name, newDataBlock)
         except StarValidationError:
             raise
@@ -288,24 +339,35 @@ class _StarDataConverter:
 
         self.stack.append(dataBlock)
 
+        self._preValidateDataBlockName(dataBlock)
+        for tag, saveFrame in dataBlock.items():
+            self._preValidateDataBlockItem(tag, saveFrame)
+
+        self.stack.pop()
+
+    def _preValidateDataBlockName(self, dataBlock):
+        """Check the DataBlock name, shared by preValidateDataBlock and convertDataBlock
+        """
         name = dataBlock.name
         if name != 'global_' and not name.startswith('data_'):
             self.raiseValidationError("DataBlock name  must be 'global_' or start with 'data_'")
 
-        for tag, saveFrame in dataBlock.items():
-
-            if isinstance(saveFrame, GenericStarParser.SaveFrame):
-                self.preValidateSaveFrame(saveFrame)
-            else:
-                self.raiseValidationError("%s file DataBlock contains non-saveframe element %s:%s"
-                                          % (self.fileType, tag, saveFrame))
-
-        self.stack.pop()
+    def _preValidateDataBlockItem(self, tag, saveFrame):
+        """Check a single DataBlock element, shared by preValidateDataBlock and convertDataBlock
+        """
+        if isinstance(saveFrame, GenericStarParser.SaveFrame):
+            self.preValidateSaveFrame(saveFrame)
+        else:
+            self.raiseValidationError("%s file DataBlock contains non-saveframe element %s:%s"
+                                      % (self.fileType, tag, saveFrame))
 
-    def convertDataBlock(self, dataBlock):
+    def convertDataBlock(self, dataBlock, validate=False):
 
         self.stack.append(dataBlock)
 
+        if validate:
+            self._preValidateDataBlockName(dataBlock)
+
         # get NmrDataBlock name
         name = dataBlock.name
         if name.startswith('data_'):
@@ -316,7 +378,9 @@ class _StarDataConverter:
         # Make NmrDataBlock and connect it
         nmrDataBlock = NmrDataBlock(name=name)
 
-        for saveFrame in dataBlock.values():
+        for tag, saveFrame in dataBlock.items():
+            if validate:
+                self._preValidateDataBlockItem(tag, saveFrame)
             nmrSaveFrame = self.convertSaveFrame(saveFrame)
             nmrDataBlock.addItem(nmrSaveFrame.name, nmrSaveFrame)
         #
@@ -326,16 +390,14 @@ class _StarDataConverter:
     def preValidateSaveFrame(self, saveFrame):
 
         self.stack.append(saveFrame)
-        commonPrefix = os.path.commonprefix([tt[0] for tt in saveFrame.items()
-                                             if isinstance(tt[1], str)])
-        tt = commonPrefix.split('.', 1)
-        if len(tt) == 2:
-            prefix = tt[0] + '.'
-        else:
+        itemTags = [tag for tag, value in saveFrame.items() if isinstance(value, str)]
+        prefix = _commonDotPrefix(itemTags)
+        if prefix is None:
             self.raiseValidationError(
                     "Saveframe tags do not start with a common dot-separated prefix: %s"
-                    % [tt[0] for tt in saveFrame.items() if isinstance(tt[1], str)]
+                    % itemTags
                     )
+        self._saveFramePrefixes[id(saveFrame)] = prefix
 
         sf_category = saveFrame.get(prefix + 'sf_category')
         if sf_category is None:
@@ -344,9 +406,7 @@ class _StarDataConverter:
         if sf_framecode is None:
             self.raiseValidationError("SaveFrame lacks .sf_framecode item")
 
-        sf_lowername = saveFrame.name  # NB tags are lower-cased from the parser
-        if sf_lowername.startswith('save_'):
-            sf_lowername = sf_lowername[5:]
+        sf_lowername = saveFrame.name.removeprefix('save_')  # NB tags are lower-cased from the parser
         if sf_lowername != sf_framecode.lower():
             self.raiseValidationError("Saveframe.name %s does not match sf_framecode %s"
                                       % (sf_lowername, sf_framecode))
@@ -378,24 +438,21 @@ class _StarDataConverter:
 
         self.stack.append(saveFrame)
 
-        #Get common dot-separated prefix from non-loop items
-        commonPrefix = os.path.commonprefix([tt[0] for tt in saveFrame.items()
-                                             if isinstance(tt[1], str)])
-        tt = commonPrefix.split('.', 1)
-        if len(tt) == 2:
-            prefix = tt[0] + '.'
-        else:
-            self.raiseValidationError(
-                    "Saveframe tags do not start with a common dot-separated prefix: %s"
-                    % [tt[0] for tt in saveFrame.items() if isinstance(tt[1], str)]
-                    )
+        #Get common dot-separated prefix from non-loop items, unless already found by the prevalidation
+        prefix = self._saveFramePrefixes.pop(id(saveFrame), None)
+        if prefix is None:
+            itemTags = [tag for tag, value in saveFrame.items() if isinstance(value, str)]
+            prefix = _commonDotPrefix(itemTags)
+            if prefix is None:
+                self.raiseValidationError(
+                        "Saveframe tags do not start with a common dot-separated prefix: %s"
+                        % itemTags
+                        )
 
         # get category and framecode
         # The prevalidation has already established that there is exactly one tag for each
-        tags = [x for x in saveFrame if x.endswith('.sf_framecode')]
-        sf_framecode = saveFrame[tags[0]]
-        tags = [x for x in saveFrame if x.endswith('.sf_category')]
-        sf_category = saveFrame[tags[0]]
+        sf_framecode = saveFrame[prefix + 'sf_framecode']
+        sf_category = saveFrame[prefix + 'sf_category']
 
         newSaveFrame = NmrSaveFrame(name=sf_framecode, category=sf_category)
 
@@ -426,8 +483,7 @@ class _StarDataConverter:
         self.stack.append(loop)
 
         columns = loop._columns
-        commonPrefix = os.path.commonprefix(columns)
-        if len(commonPrefix.split('.', 1)) != 2:
+        if _commonDotPrefix(columns) is None:
             self.raiseValidationError(
                     "Column names of %s do not start with a common dot-separated prefix: %s" % (loop, columns)
                     )
@@ -439,11 +495,10 @@ class _StarDataConverter:
         self.stack.append(loop)
 
         oldColumns = loop.columns
-        commonPrefix = os.path.commonprefix(oldColumns)
-        tt = commonPrefix.split('.', 1)
-        if len(tt) == 2:
-            category = tt[0]
-            lenPrefix = len(category) + 1
+        prefix = _commonDotPrefix(oldColumns)
+        if prefix is not None:
+            category = prefix[:-1]
+            lenPrefix = len(prefix)
             if category[0] == '_':
                 category = category[1:]
         else:
@@ -459,9 +514,10 @@ class _StarDataConverter:
             # Check for valid field names
             if tag and not tag.isalpha():
                 if self.convertColumnNames:
-                    tag = ''.join(x if x.isalnum() else '_' for x in tag)
-                    while tag and not tag[0].isalpha():
-                        tag = tag[1:]
+                    tag = _NON_ALNUM_PATTERN.sub('_', tag)
+                    # drop leading characters up to the first letter
+                    start = next((ii for ii, char in enumerate(tag) if char.isalpha()), len(tag))
+                    tag = tag[start:]
                 else:
                     raise ValueError("Invalid column name 1: %s" % ss)
             if not tag:
@@ -474,11 +530,10 @@ class _StarDataConverter:
 
         newLoop = NmrLoop(category, columns)
         ff = self.convertValue  #convertValue(value, category=lowerCaseCategory, tag=tag)
-        for row in loop.data:
-            values = [ff(x, category, columns[ii]) if isinstance(x, UnquotedValue) else x
-                      for ii, x in enumerate(row.values())
-                      ]
-            newLoop.newRow(values)
+        # UnquotedValue has no subclasses, so an exact type test is sufficient
+        newLoop.extendRows([ff(x, category, column) if type(x) is UnquotedValue else x
+                            for column, x in zip(columns, row.values())]
+                           for row in loop.data)
 
         #
         self.stack.pop()
@@ -494,33 +549,30 @@ class _StarDataConverter:
         #   #
         #   return value
 
-        # Convert special values
-        if value == NULLSTRING:
-            # null  value
-            value = None
-        elif value == TRUESTRING:
-            # Boolean True
-            value = True
-        elif value == FALSESTRING:
-            # Boolean False
-            value = False
-        elif value == UNKNOWNSTRING:
-            value = None
+        # Convert special values - null, unknown, and Boolean True and False
+        special = _SPECIAL_VALUES.get(value, _MISSING)
+        if special is not _MISSING:
+            value = special
         elif value[0] == '$':
             # SaveFrame reference
             value = value[1:]
         else:
-            if not (tag[-5:] in ('_code', '_name') or '_code_' in tag or '_name_' in tag):
+            if not _isStringTag(tag):
                 # HACK - tags ending in '_code' or '_name' are assumed to be string type
                 # This takes care of e.g. 'sequence_code'
                 # that often might evaluate to a number otherwise
-                try:
+                first = value[0]
+                if _INTEGER_PATTERN.match(value):
                     value = int(value)
-                except ValueError:
+                elif first in _NUMBER_START or not first.isascii():
+                    # Values that int() or float() might accept, e.g. '1.5', 'NaN', '1_000'
                     try:
-                        value = float(value)
+                        value = int(value)
                     except ValueError:
-                        pass
+                        try:
+                            value = float(value)
+                        except ValueError:
+                            pass
         #
         return value
 
@@ -534,6 +586,22 @@ class _StarDataConverter:
         raise StarValidationError(self._errorMessage(msg))
 
 
+# nef_sequence.linking values, by the way splitNefSequence treats them
+_LINK_ILLEGAL = 0
+_LINK_CYCLIC = 1
+_LINK_ISOLATED = 2
+_LINK_START = 3
+_LINK_END = 4
+_LINK_MIDDLE = 5
+_LINK_BREAK = 6
+_LINKING_CODES = {'cyclic': _LINK_CYCLIC,
+                  'single': _LINK_ISOLATED, 'nonlinear': _LINK_ISOLATED, 'dummy': _LINK_ISOLATED,
+                  'start': _LINK_START,
+                  'end': _LINK_END,
+                  'middle': _LINK_MIDDLE, None: _LINK_MIDDLE,
+                  'break': _LINK_BREAK}
+
+
 def splitNefSequence(rows):
     """Split a sequence of nef_sequence dicts assumed to belong to the same chain
     into a list of lists of sequentially linked stretches following the NEF rules
@@ -546,15 +614,22 @@ def splitNefSequence(rows):
     result = []
     stretch = []
     inCyclic = False
+    linkingCodes = _LINKING_CODES
     for row in rows:
         linking = row.get('linking')
+        code = linkingCodes.get(linking, _LINK_ILLEGAL)
 
-        if inCyclic and linking not in ('middle', 'cyclic', None):
+        if inCyclic and code != _LINK_MIDDLE and code != _LINK_CYCLIC:
             raise ValueError(
                     "Sequence contains 'cyclic' residue(s) that do not form a closed, cyclic molecule"
                     )
 
-        if linking == 'cyclic':
+        if code == _LINK_MIDDLE:
+            # Continuation (we treat None as 'middle' as the most pragmatic approach
+            # Validation of the NEF standard must be done elsewhere
+            stretch.append(row)
+
+        elif code == _LINK_CYCLIC:
             if inCyclic:
                 # End of cycle
                 inCyclic = False
@@ -568,31 +643,26 @@ def splitNefSequence(rows):
                     result.append(stretch)
                 stretch = [row]
 
-        elif linking in ('single', 'nonlinear', 'dummy'):
+        elif code == _LINK_ISOLATED:
             # Always isolated. And last stretch, add new one, and prepare for the next one
             if stretch:
                 result.append(stretch)
             result.append([row])
             stretch = []
 
-        elif linking == 'start':
+        elif code == _LINK_START:
             # Start new stretch
             if stretch:
                 result.append(stretch)
             stretch = [row]
 
-        elif linking == 'end':
+        elif code == _LINK_END:
             # End stretch
             stretch.append(row)
             result.append(stretch)
             stretch = []
 
-        elif linking in ('middle', None):
-            # Continuation (we treat None as 'middle' as the most pragmatic approach
-            # Validation of the NEF standard must be done elsewhere
-            stretch.append(row)
-
-        elif linking == 'break':
+        elif code == _LINK_BREAK:
 
             # TODO NBNB This follows NEF spec as of July 2016 - which is rather confused
             # Propose change so that 'break' signals a chain break AFTER that residue,
@@ -607,7 +677,6 @@ def splitNefSequence(rows):
                 # Start of stretch - put row on
                 stretch.append(row)
 
-
         else:
             raise ValueError("Illegal value of nef_sequence.linking: %s" % linking)
 
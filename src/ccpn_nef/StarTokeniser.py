@@ -146,3 +146,11 @@ def getTokenIterator(text):
     """Iterator that returns an iterator over all STAR tokens in a generic STAR file"""
     return (StarToken(x.lastindex, x.group(x.lastindex))
             for x in _star_pattern.finditer(text))
+
+
+def iterTokenTuples(text, _finditer=_star_pattern.finditer):
+    """Iterator over all STAR tokens in a generic STAR file as plain (type, value) tuples,
+    for use by the parser, which only unpacks the tokens"""
+    for match in _finditer(text):
+        idx = match.lastindex
+        yield (idx, match.group(idx))
@@ -31,10 +31,13 @@ __date__ = "$Date: 2017-03-23 16:50:22 +0000 (Thu, March 23, 2017) $"
 #=========================================================================================
 
 import re
+import sys
+from collections import Counter, namedtuple
 
 NMR_EXCHANGE_FORMAT = 'nmr_exchange_format'
 FRAME_PREFIX = 'nef_saveframe_'
 FRAME_SEARCH = r'{}(\w+)'.format(FRAME_PREFIX)
+_FRAME_SEARCH_PATTERN = re.compile(FRAME_SEARCH)
 SF_CATEGORY = 'sf_category'
 SF_FRAMECODE = 'sf_framecode'
 NAME = 'name'
@@ -55,6 +58,17 @@ UUID = 'uuid'
 VERSION = 'version'
 CCPN_PREFIX = 'ccpn_'
 
+# mandatory and allowed fields of a validation saveframe, see Validator._getValidFrameFields
+# - the allowed fields and loop names are held as frozensets for membership tests
+_ValidFrameFields = namedtuple('_ValidFrameFields', ('mandatoryFields', 'allowedFields', 'loopNames', 'mandatoryLoops',
+                                                     'mandatoryLoopFields', 'allowedLoopFields'))
+
+
+def _intern(name):
+    """Return name as an interned plain string, so that key lookups against it compare by identity
+    """
+    return sys.intern(str(name)) if isinstance(name, str) else name
+
 
 class Validator(object):
 
@@ -103,80 +117,128 @@ class Validator(object):
         e = self._validation_errors[SAVEFRAME]
         e += self._validate_nmr_meta_data(nef, validNef)
 
+        # validation saveframes by the category they describe (the first one, if there are several);
+        # ccpn_ categories are only validated if described by the first validation saveframe
+        validFramesByCategory = {}
+        firstCategory = None
+        for ii, validFrame in enumerate(validNef.values()):
+
+            # get the actual name from the end the the name - may need to be more complex later
+            match = _FRAME_SEARCH_PATTERN.search(validFrame.name)
+            checkName = match.group(1) if match else None
+            if not ii:
+                firstCategory = checkName
+            if checkName and checkName not in validFramesByCategory:
+                validFramesByCategory[checkName] = (checkName, validFrame)
+
+        validFrameFields = {}
+
         # go through all the saveframes in the Nef object
         for sf_name, saveframe in nef.items():
 
-            if SF_FRAMECODE not in saveframe or saveframe.name != saveframe[SF_FRAMECODE]:
+            # fetch the framecode and category once - missing values are None
+            sf_framecode = saveframe.get(SF_FRAMECODE)
+            if sf_framecode is None or saveframe.name != sf_framecode:
                 e = self._validation_errors[SAVEFRAME]
-                e += ["Saveframe.name for sf_framecode '{}' is not defined correctly.".format(saveframe[SF_FRAMECODE]), ]
+                e += ["Saveframe.name for sf_framecode '{}' is not defined correctly.".format(sf_framecode), ]
                 break
 
             # check against the validation dictionary
-            for vName, validFrame in validNef.items():
-
-                # get the actual name from the end the the name - may need to be more complex later
-                checkName = re.findall(FRAME_SEARCH, validFrame.name)
-
-                if checkName and SF_CATEGORY in saveframe and saveframe[SF_CATEGORY] == checkName[0]:
-
-                    ERROR_KEY = checkName[0]
-                    if ERROR_KEY not in self._validation_errors:
-                        self._validation_errors[ERROR_KEY] = []
-                    e = self._validation_errors[ERROR_KEY]
-
-                    # check items against loop_category = None, i.e., this saveframe
-                    mandatoryFields = [nm[NAME] for nm in validFrame[NEF_ITEM].data if nm[IS_MANDATORY] is True and nm[LOOP_CATEGORY] is None]
-                    optionalFields = [nm[NAME] for nm in validFrame[NEF_ITEM].data if nm[IS_MANDATORY] is False and nm[LOOP_CATEGORY] is None]
-                    loopNames = [nm['category'] for nm in validFrame[NEF_LOOP].data]
-
-                    # check for missing words/framecode is not correct/category is mismatched/bad fields (keys)
-                    e += self._sf_framecode_name_mismatch(saveframe, sf_name)
-                    e += self._dict_missing_keys(saveframe, mandatoryFields, label=sf_name)
-                    e += self._sf_category_name_mismatch(saveframe, checkName[0])
-                    e += self._dict_nonallowed_keys(saveframe, mandatoryFields + optionalFields + loopNames, label=sf_name)
-
-                    loops = [kk for kk in saveframe.keys() if kk in loopNames]
-
-                    # check that all the mandatory loops have been included
-                    mandatoryLoops = [nm[CATEGORY] for nm in validFrame[NEF_LOOP].data if nm[IS_MANDATORY] is True]
-                    e += self._dict_missing_keys(loops, mandatoryLoops, label=sf_name, keyType='loop')
+            sf_category = saveframe.get(SF_CATEGORY)
+            if sf_category is not None and sf_category.startswith(CCPN_PREFIX) and sf_category != firstCategory:
+                # skip ccpn_ specific categories for now.
+                continue
+            checkName, validFrame = validFramesByCategory.get(sf_category, (None, None))
 
-                    # iterate through loops
-                    for loop in loops:
-
-                        # get the keys that belong to this loop
-                        mandatoryLoopFields = [nm[NAME] for nm in validFrame[NEF_ITEM].data if nm[IS_MANDATORY] is True and nm[LOOP_CATEGORY] == loop]
-                        optionalLoopFields = [nm[NAME] for nm in validFrame[NEF_ITEM].data if nm[IS_MANDATORY] is False and nm[LOOP_CATEGORY] == loop]
-
-                        if saveframe[loop]:
-                            # NOTE:ED - changed to allow empty loops
-                            if saveframe[loop].data:
-                                # check for missing words/bad fields (keys)/malformed loops
-                                e += self._dict_missing_keys(saveframe[loop].data[0], mandatoryLoopFields, label='{}:{}'.format(sf_name, loop))
-                                e += self._dict_nonallowed_keys(saveframe[loop].data[0], mandatoryLoopFields + optionalLoopFields, label='{}:{}'.format(sf_name, loop))
-                                e += self._loop_entries_inconsistent_keys(saveframe[loop].data, label='{}:{}'.format(sf_name, loop))
-                            else:
-                                # there should not be any loops without data - could be mandatory loops
-                                # e += ["Loop '{}' contains no data.".format(loop), ]
-                                pass
-
-                        else:
-                            # this error is a catch-all as loadFile should test the integrity of the nef file before validation
-                            e += ["Error reading loop '{}'.".format(loop), ]
-
-                    break
-
-                elif SF_CATEGORY in saveframe and saveframe[SF_CATEGORY].startswith(CCPN_PREFIX):
-
-                    # skip ccpn_ specific categories for now.
-                    break
-
-            else:
+            if validFrame is None:
                 e = self._validation_errors[SAVEFRAME]
-                e += ["No sf_category '{}' found (possibly bad name defined).".format(saveframe[SF_CATEGORY]),]
+                e += ["No sf_category '{}' found (possibly bad name defined).".format(sf_category),]
+                continue
+
+            ERROR_KEY = checkName
+            if ERROR_KEY not in self._validation_errors:
+                self._validation_errors[ERROR_KEY] = []
+            e = self._validation_errors[ERROR_KEY]
+
+            # the fields of each validFrame are only extracted once, on the first matching saveframe
+            fields = validFrameFields.get(checkName)
+            if fields is None:
+                fields = validFrameFields[checkName] = self._getValidFrameFields(validFrame)
+
+            # check items against loop_category = None, i.e., this saveframe
+            mandatoryFields = fields.mandatoryFields
+            loopNames = fields.loopNames
+
+            # check for missing words/framecode is not correct/category is mismatched/bad fields (keys)
+            e += self._sf_framecode_name_mismatch(saveframe, sf_name)
+            e += self._dict_missing_keys(saveframe, mandatoryFields, label=sf_name)
+            e += self._sf_category_name_mismatch(saveframe, checkName)
+            e += self._dict_nonallowed_keys(saveframe, fields.allowedFields, label=sf_name)
+
+            loops = [kk for kk in saveframe.keys() if kk in loopNames]
+
+            # check that all the mandatory loops have been included
+            e += self._dict_missing_keys(loops, fields.mandatoryLoops, label=sf_name, keyType='loop')
+
+            # iterate through loops
+            for loop in loops:
+
+                # get the keys that belong to this loop
+                mandatoryLoopFields = fields.mandatoryLoopFields.get(loop, [])
+                allowedLoopFields = fields.allowedLoopFields.get(loop, frozenset())
+
+                if saveframe[loop]:
+                    # NOTE:ED - changed to allow empty loops
+                    if saveframe[loop].data:
+                        # check for missing words/bad fields (keys)/malformed loops
+                        e += self._dict_missing_keys(saveframe[loop].data[0], mandatoryLoopFields, label='{}:{}'.format(sf_name, loop))
+                        e += self._dict_nonallowed_keys(saveframe[loop].data[0], allowedLoopFields, label='{}:{}'.format(sf_name, loop))
+                        e += self._loop_entries_inconsistent_keys(saveframe[loop].data, label='{}:{}'.format(sf_name, loop))
+                    else:
+                        # there should not be any loops without data - could be mandatory loops
+                        # e += ["Loop '{}' contains no data.".format(loop), ]
+                        pass
+
+                else:
+                    # this error is a catch-all as loadFile should test the integrity of the nef file before validation
+                    e += ["Error reading loop '{}'.".format(loop), ]
 
         return self._validation_errors
 
+    def _getValidFrameFields(self, validFrame):
+        """Extract the mandatory and allowed saveframe items, loops and loop items
+        from a validation saveframe, in a single pass over its nef_item loop
+        """
+        mandatoryFields = []
+        optionalFields = []
+        mandatoryLoopFields = {}
+        optionalLoopFields = {}
+        for nm in validFrame[NEF_ITEM].data:
+            isMandatory = nm[IS_MANDATORY]
+            loopCategory = _intern(nm[LOOP_CATEGORY])
+            if isMandatory is True:
+                if loopCategory is None:
+                    mandatoryFields.append(_intern(nm[NAME]))
+                else:
+                    mandatoryLoopFields.setdefault(loopCategory, []).append(_intern(nm[NAME]))
+            elif isMandatory is False:
+                if loopCategory is None:
+                    optionalFields.append(_intern(nm[NAME]))
+                else:
+                    optionalLoopFields.setdefault(loopCategory, []).append(_intern(nm[NAME]))
+
+        loopNames = [_intern(nm[CATEGORY]) for nm in validFrame[NEF_LOOP].data]
+        mandatoryLoops = [_intern(nm[CATEGORY]) for nm in validFrame[NEF_LOOP].data if nm[IS_MANDATORY] is True]
+        allowedLoopFields = {loop: frozenset(mandatoryLoopFields.get(loop, []) + optionalLoopFields.get(loop, []))
+                             for loop in set(mandatoryLoopFields) | set(optionalLoopFields)}
+
+        return _ValidFrameFields(mandatoryFields=mandatoryFields,
+                                 allowedFields=frozenset(mandatoryFields + optionalFields + loopNames),
+                                 loopNames=frozenset(loopNames),
+                                 mandatoryLoops=mandatoryLoops,
+                                 mandatoryLoopFields=mandatoryLoopFields,
+                                 allowedLoopFields=allowedLoopFields)
+
     def _validate_nmr_meta_data(self, nef, validNef):
         """Check that the information in the meta_data is correct for this version
         """
@@ -217,29 +279,25 @@ class Validator(object):
             return e
 
     def _dict_missing_keys(self, dct, required_keys, label=None, keyType='label'):
+        if isinstance(dct, (list, tuple)):
+            # keys may also be given as a sequence, e.g., the loop names of a saveframe
+            dct = set(dct)
         if label is None:
-            return ['Missing {} {}.'.format(key, keyType) for key in required_keys if key not in dct]
-        return ['{}: missing {} {}.'.format(label, key, keyType) for key in required_keys if key not in dct]
+            return [f'Missing {key} {keyType}.' for key in required_keys if key not in dct]
+        return [f'{label}: missing {key} {keyType}.' for key in required_keys if key not in dct]
 
     def _dict_duplicate_keys(self, dct, label=None, keyType='label'):
-        dctSet = set(dct)
-        if len(dct) == len(dctSet):
+        duplicates = [key for key, count in Counter(dct).items() if count > 1]
+        if not duplicates:
             return []
 
         if label is None:
-            return ['Duplicated {} {}.'.format(key, keyType) for key in dctSet if dct.count(key) > 1]
-        return ['{}: Duplicated {} {}.'.format(label, key, keyType) for key in dctSet if dct.count(key) > 1]
+            return ['Duplicated {} {}.'.format(key, keyType) for key in duplicates]
+        return ['{}: Duplicated {} {}.'.format(label, key, keyType) for key in duplicates]
 
     def _dict_missing_value_with_key(self, dct, keys):
-        errors = []
-        for key in keys:
-            found_key = False
-            for k, v in dct.items():
-                if ('sf_category' in v) and (v['sf_category'] == key):
-                    found_key = True
-            if not found_key:
-                errors.append('No saveframes with sf_category: {}.'.format(key))
-        return errors
+        categories = set(v['sf_category'] for v in dct.values() if 'sf_category' in v)
+        return ['No saveframes with sf_category: {}.'.format(key) for key in keys if key not in categories]
 
     def _sf_framecode_name_mismatch(self, dct, sf_framecode):
         if 'sf_framecode' in dct:
@@ -258,27 +316,31 @@ class Validator(object):
     def _loop_entries_inconsistent_keys(self, loop, label):
         errors = []
         if len(loop) > 0:
-            fields = list(loop[0].keys())
+            # loop rows nearly always share the same fields - the keys-view comparisons run in C
+            firstKeys = loop[0].keys()
+            if all(entry.keys() == firstKeys for entry in loop):
+                return errors
+
+            # collect the union of the fields in a single pass, keeping the order of discovery
+            fields = list(firstKeys)
+            seen = set(fields)
+            for entry in loop:
+                for field in entry:
+                    if field not in seen:
+                        seen.add(field)
+                        fields.append(field)
+
             fields_count = len(fields)
-            finished = False
-            while not finished:
-                errors = []
-                finished = True
-                for i, entry in enumerate(loop):
-                    for field in entry:
-                        if field not in fields:
-                            fields.append(field)
-                    if len(fields) > fields_count:
-                        fields_count = len(fields)
-                        finished = False
-                        break
+            for i, entry in enumerate(loop):
+                # an entry holding as many fields as the union cannot be missing any
+                if len(entry) != fields_count:
                     errors += self._dict_missing_keys(entry, fields, label=label + ' item {}'
                                                       .format(i))
         return errors
 
     def _dict_nonallowed_keys(self, dct, allowed_keys, label=None):
         if label is None:
-            return ["Field '{}' not allowed.".format(key)
+            return [f"Field '{key}' not allowed."
                     for key in dct.keys() if key not in allowed_keys and not key.startswith(CCPN_PREFIX)]
-        return ["Field '{}' not allowed in {}.".format(key, label)
+        return [f"Field '{key}' not allowed in {label}."
                 for key in dct.keys() if key not in allowed_keys and not key.startswith(CCPN_PREFIX)]
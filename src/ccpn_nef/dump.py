@@ -48,7 +48,7 @@ def dump_nef_file(filename, error_logging=el.NEF_STANDARD):
     
     # Load the NEF file
     try:
-        importer.loadFile(filename)
+        importer.loadFile(filename, validate=False)
         
         # Use the built-in toString functionality to get string representation
         content = importer.toString()
@@ -75,7 +75,7 @@ def dump_nef_text(text, error_logging=el.NEF_STANDARD):
     
     # Load the NEF text
     try:
-        importer.loadText(text)
+        importer.loadText(text, validate=False)
         
         # Use the built-in toString functionality to get string representation
         content = importer.toString()
@@ -11,8 +11,10 @@ by iterating over the structures as dictionaries, showing the true hierarchical
 structure as nested OrderedDicts with Loop objects containing columns and data.
 """
 
+import io
 import sys
 import os
+from itertools import islice
 try:
     from tabulate import tabulate
 except ImportError:
@@ -22,16 +24,35 @@ except ImportError:
 try:
     from . import NefImporter
     from . import ErrorLog as el
+    from .GenericStarParser import Loop, UnquotedValue
 except ImportError:
     # If running as standalone script, try direct import
     try:
         import NefImporter
         import ErrorLog as el
+        from GenericStarParser import Loop, UnquotedValue
     except ImportError:
         # Last resort - add current directory to path and import
         sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
         import NefImporter
         import ErrorLog as el
+        from GenericStarParser import Loop, UnquotedValue
+
+# Types of the simple values found in a parsed NEF file - these never need the hasattr probes
+_SIMPLE_TYPES = frozenset((str, UnquotedValue, int, float, bool, type(None)))
+_NO_NAME = object()
+
+# Indent strings by depth, extended on demand by _indent
+_INDENTS = ["  " * depth for depth in range(64)]
+
+
+def _indent(depth):
+    """Return the indent string for depth."""
+    try:
+        return _INDENTS[depth]
+    except IndexError:
+        _INDENTS.extend("  " * dd for dd in range(len(_INDENTS), depth + 1))
+        return _INDENTS[depth]
 
 
 def dump_nef_as_dict(filename, max_depth=None, show_loop_data=True, max_loop_rows=None, error_logging=el.NEF_STANDARD):
@@ -45,25 +66,39 @@ def dump_nef_as_dict(filename, max_depth=None, show_loop_data=True, max_loop_row
     :param error_logging: Error logging mode (default: NEF_STANDARD)
     :return: String representation of the NEF as constructor-style objects
     """
+    buffer = io.StringIO()
+    dump_nef_as_dict_to(filename, buffer, max_depth=max_depth, show_loop_data=show_loop_data,
+                        max_loop_rows=max_loop_rows, error_logging=error_logging)
+    return buffer.getvalue()
+
+
+def dump_nef_as_dict_to(filename, out_stream, max_depth=None, show_loop_data=True, max_loop_rows=None,
+                        error_logging=el.NEF_STANDARD):
+    """
+    Parse a NEF file and write its contents as constructor-style representation to a stream,
+    fragment by fragment, without building the whole representation in memory.
+    
+    :param filename: Path to the NEF file to parse
+    :param out_stream: Text stream to write to, e.g. sys.stdout
+    :param max_depth: Maximum depth to traverse (default: None = unlimited)
+    :param show_loop_data: Whether to show actual loop data (default: True)
+    :param max_loop_rows: Maximum number of loop rows to display (default: None = all rows)
+    :param error_logging: Error logging mode (default: NEF_STANDARD)
+    """
     # Create NefImporter instance
     importer = NefImporter.NefImporter(errorLogging=error_logging)
     
     try:
         # Load the NEF file
-        importer.loadFile(filename)
+        importer.loadFile(filename, validate=False)
         
         # Get the internal dictionary structure
         nef_dict = importer._nefDict
         
-        # Build constructor-style representation
-        output = []
-        output.append("# source={}".format(filename))
-        output.append("")
-        
-        # Generate constructor-style output
-        output.append("parse = {}".format(_format_as_constructor(nef_dict, show_loop_data, max_loop_rows, max_depth, depth=0)))
-        
-        return "\n".join(output)
+        # Write constructor-style representation
+        write = out_stream.write
+        write("# source={}\n\nparse = ".format(filename))
+        _emit_as_constructor(nef_dict, write, show_loop_data, max_loop_rows, max_depth, depth=0)
         
     except Exception as e:
         error_msg = "Error loading NEF file '{}': {}".format(filename, str(e))
@@ -72,104 +107,140 @@ def dump_nef_as_dict(filename, max_depth=None, show_loop_data=True, max_loop_row
         raise
 
 
-def _format_as_constructor(obj, show_loop_data=True, max_loop_rows=None, max_depth=None, depth=0):
-    """Format NEF structures as constructor-style representation."""
+def _emit_as_constructor(obj, write, show_loop_data=True, max_loop_rows=None, max_depth=None, depth=0):
+    """Write NEF structures as constructor-style representation, fragment by fragment, to write.
+    Nested dictionary-like objects are walked with an explicit stack rather than by recursion."""
     
-    if max_depth is not None and depth >= max_depth:
-        return "[max depth reached]"
-    
-    base_indent = "  " * depth
-    param_indent = "  " * (depth + 1)
-    child_indent = "  " * (depth + 2)
+    frame = _open_constructor(obj, write, max_depth, depth)
     
-    # Check if it's a dictionary-like object
-    if hasattr(obj, 'keys'):
-        class_name = type(obj).__name__
-        
-        # Get constructor parameters
-        constructor_params = []
-        
-        # Add name parameter if available
-        if hasattr(obj, 'name'):
-            constructor_params.append("name='{}'".format(getattr(obj, 'name', '')))
+    # Stack of open dictionary-like objects, as [remaining children, depth, separator]
+    stack = [frame] if frame is not None else []
+    while stack:
+        frame = stack[-1]
+        children, depth = frame[0], frame[1]
+        child_indent = _indent(depth + 2)
         
         # Build children dictionary
-        children_items = []
-        for key in obj.keys():
-            value = obj[key]
-            
+        for key, value in children:
+            write(f"{frame[2]}{child_indent}'{key}': ")
+            frame[2] = "\n"
+            valueType = type(value)
+
+            # Simple values are by far the most common - skip the probes below
+            if valueType in _SIMPLE_TYPES:
+                write(f"{_format_constructor_value(value)} # {valueType.__name__}")
+
             # Check if it's a Loop object
-            if hasattr(value, 'columns') and hasattr(value, 'data'):
+            elif isinstance(value, Loop) or (hasattr(value, 'columns') and hasattr(value, 'data')):
                 if show_loop_data:
-                    loop_repr = _format_loop_as_constructor(value, max_loop_rows, depth + 2)
-                    children_items.append("{}'{}': {}".format(child_indent, key, loop_repr))
+                    _emit_loop_as_constructor(value, write, max_loop_rows, depth + 2)
                 else:
-                    children_items.append("{}'{}': Loop(name='{}', columns={}, rows={})".format(
-                        child_indent, key, getattr(value, 'name', ''), len(getattr(value, 'columns', [])), len(getattr(value, 'data', []))))
+                    write("Loop(name='{}', columns={}, rows={})".format(
+                        getattr(value, 'name', ''), len(value.columns), len(value.data)))
             
-            # Check if it's another dictionary-like (SaveFrame)
-            elif hasattr(value, 'keys'):
-                child_repr = _format_as_constructor(value, show_loop_data, max_loop_rows, max_depth, depth + 2)
-                children_items.append("{}'{}': {}".format(child_indent, key, child_repr))
+            # Check if it's another dictionary-like (SaveFrame) - descend, resuming this one afterwards
+            elif isinstance(value, dict) or hasattr(value, 'keys'):
+                childFrame = _open_constructor(value, write, max_depth, depth + 2)
+                if childFrame is not None:
+                    stack.append(childFrame)
+                    break
             
             # Simple value
             else:
-                value_repr = _format_constructor_value(value)
-                children_items.append("{}'{}': {} # {}".format(child_indent, key, value_repr, type(value).__name__))
+                write(f"{_format_constructor_value(value)} # {valueType.__name__}")
         
-        # Build constructor call with proper formatting
-        if children_items:
-            children_str = "{{\n{}\n{}}}".format("\n".join(children_items), param_indent)
-            
-            if len(constructor_params) > 0:
-                param_str = "\n{}{}, \n{}children={}".format(
-                    param_indent, constructor_params[0], param_indent, children_str)
-                return "{}({}\n{})".format(class_name, param_str, base_indent)
-            else:
-                return "{}(\n{}children={}\n{})".format(class_name, param_indent, children_str, base_indent)
         else:
+            # all children written, close the constructor call
+            stack.pop()
+            write("\n{}}}\n{})".format(_indent(depth + 1), _indent(depth)))
+
+
+def _open_constructor(obj, write, max_depth, depth):
+    """Write the opening of the constructor-style representation of obj.
+    Return [iterator of children, depth, separator] if the children of obj remain to be written,
+    otherwise None."""
+    
+    if max_depth is not None and depth >= max_depth:
+        write("[max depth reached]")
+        return None
+    
+    # Check if it's a dictionary-like object
+    if isinstance(obj, dict) or hasattr(obj, 'keys'):
+        class_name = type(obj).__name__
+        param_indent = _indent(depth + 1)
+        
+        # Get constructor parameters
+        constructor_params = []
+        
+        # Add name parameter if available
+        name = getattr(obj, 'name', _NO_NAME)
+        if name is not _NO_NAME:
+            constructor_params.append("name='{}'".format(name))
+        
+        items = list(obj.items())
+        if not items:
             # No children, simple constructor
-            if constructor_params:
-                return "{}({})".format(class_name, ", ".join(constructor_params))
-            else:
-                return "{}()".format(class_name)
+            write("{}({})".format(class_name, ", ".join(constructor_params)))
+            return None
+        
+        # Build constructor call with proper formatting
+        if constructor_params:
+            write("{}(\n{}{}, \n{}children={{\n".format(class_name, param_indent, constructor_params[0], param_indent))
+        else:
+            write("{}(\n{}children={{\n".format(class_name, param_indent))
+        return [iter(items), depth, ""]
     
     else:
         # Not dictionary-like
-        return "{} # {}".format(_format_constructor_value(obj), type(obj).__name__)
+        write("{} # {}".format(_format_constructor_value(obj), type(obj).__name__))
+        return None
 
 
-def _format_loop_as_constructor(loop_obj, max_loop_rows=None, depth=0):
-    """Format Loop objects as constructor-style representation."""
+def _emit_loop_as_constructor(loop_obj, write, max_loop_rows=None, depth=0):
+    """Write Loop objects as constructor-style representation, fragment by fragment, to write."""
     
-    base_indent = "  " * depth
-    param_indent = "  " * (depth + 1)
-    data_indent = "  " * (depth + 2)
+    base_indent = _indent(depth)
+    param_indent = _indent(depth + 1)
+    data_indent = _indent(depth + 2)
     
-    constructor_params = []
+    hasName = hasattr(loop_obj, 'name')
+    hasColumns = hasattr(loop_obj, 'columns')
+    hasData = hasattr(loop_obj, 'data')
+    
+    # Format constructor with proper multi-line indentation
+    if hasName + hasColumns + hasData > 1:
+        write("Loop(\n")
+        prefix, separator, closing = param_indent, ",\n" + param_indent, "\n{})".format(base_indent)
+    else:
+        write("Loop(")
+        prefix, separator, closing = "", ", ", ")"
     
     # Add name parameter
-    if hasattr(loop_obj, 'name'):
-        constructor_params.append("name='{}'".format(getattr(loop_obj, 'name', '')))
+    if hasName:
+        write("{}name='{}'".format(prefix, getattr(loop_obj, 'name', '')))
+        prefix = separator
     
     # Add columns - format nicely if long
-    if hasattr(loop_obj, 'columns'):
-        columns_repr = repr(loop_obj.columns)
+    if hasColumns:
+        columns = loop_obj.columns
+        columns_repr = repr(columns)
         if len(columns_repr) > 60:
             # Multi-line columns if too long
-            col_items = ["'{}'".format(col) for col in loop_obj.columns]
-            columns_str = "(\n{}{}\n{})".format(
+            col_items = ["'{}'".format(col) for col in columns]
+            write("{}columns=(\n{}{}\n{})".format(
+                prefix,
                 param_indent + "  ", 
                 (",\n" + param_indent + "  ").join(col_items),
                 param_indent
-            )
-            constructor_params.append("columns={}".format(columns_str))
+            ))
         else:
-            constructor_params.append("columns={}".format(columns_repr))
+            write("{}columns={}".format(prefix, columns_repr))
+        prefix = separator
     
     # Add data with proper indentation
-    if hasattr(loop_obj, 'data'):
-        data_len = len(loop_obj.data)
+    if hasData:
+        data = loop_obj.data
+        data_len = len(data)
         if data_len > 0:
             rows_to_show = data_len if max_loop_rows is None else min(max_loop_rows, data_len)
             
@@ -178,97 +249,86 @@ def _format_loop_as_constructor(loop_obj, max_loop_rows=None, depth=0):
                            data_len >= 5 and  # At least 5 rows
                            len(loop_obj.columns) > 6)  # More than 6 columns
             
+            write("{}data=[\n".format(prefix))
             
             if use_tabulate and rows_to_show > 0:
-                data_str = _format_loop_data_as_table(loop_obj, rows_to_show, max_loop_rows, data_len, param_indent, data_indent)
+                separator_row = "\n" if _emit_loop_data_as_table(loop_obj, write, rows_to_show, data_indent) else ""
             
             else:
                 # Use original dict-style formatting for smaller datasets
-                data_items = []
-                for i in range(rows_to_show):
-                    row = loop_obj.data[i]
-                    if hasattr(row, 'keys'):  # OrderedDict-like row
-                        row_items = []
-                        for col_key, col_val in row.items():
-                            row_items.append("'{}': {}".format(col_key, _format_constructor_value(col_val)))
-                        data_items.append("{}{{{} }}".format(data_indent, ", ".join(row_items)))
+                separator_row = ""
+                for row in islice(data, rows_to_show):
+                    if isinstance(row, dict) or hasattr(row, 'keys'):  # OrderedDict-like row
+                        row_str = ", ".join([f"'{col_key}': {_format_constructor_value(col_val)}"
+                                             for col_key, col_val in row.items()])
+                        write(f"{separator_row}{data_indent}{{{row_str} }}")
                     else:
-                        data_items.append("{}{}".format(data_indent, _format_constructor_value(row)))
-                
-                if max_loop_rows is not None and data_len > max_loop_rows:
-                    data_items.append("{}# ... ({} more rows)".format(data_indent, data_len - max_loop_rows))
-                
-                data_str = "[\n{}\n{}]".format("\n".join(data_items), param_indent)
+                        write(f"{separator_row}{data_indent}{_format_constructor_value(row)}")
+                    separator_row = "\n"
+            
+            if max_loop_rows is not None and data_len > max_loop_rows:
+                write("{}{}# ... ({} more rows)".format(separator_row, data_indent, data_len - max_loop_rows))
             
-            constructor_params.append("data={}".format(data_str))
+            write("\n{}]".format(param_indent))
         else:
-            constructor_params.append("data=[]")
+            write("{}data=[]".format(prefix))
     
-    # Format constructor with proper multi-line indentation
-    if len(constructor_params) > 1:
-        param_lines = []
-        for param in constructor_params:
-            param_lines.append("{}{}".format(param_indent, param))
-        
-        return "Loop(\n{}\n{})".format(",\n".join(param_lines), base_indent)
-    else:
-        return "Loop({})".format(", ".join(constructor_params))
+    write(closing)
 
 
-def _format_loop_data_as_table(loop_obj, rows_to_show, max_loop_rows, data_len, param_indent, data_indent):
-    """Format loop data with column alignment while maintaining valid Python syntax."""
+def _emit_loop_data_as_table(loop_obj, write, rows_to_show, data_indent):
+    """Write loop data rows with column alignment while maintaining valid Python syntax.
+    Return True if any rows were written."""
+    
+    columns = tuple(loop_obj.columns)
+    data = loop_obj.data
     
-    # First pass: collect all key-value strings and calculate max widths
-    max_widths = {}
+    # The "'column': " part of each cell is fixed per column, so is built once
+    column_prefixes = [(col_key, f"'{col_key}': ") for col_key in columns]
+    format_value = _format_constructor_value
+    
+    # First pass: collect all key-value strings, positionally by column, and calculate max widths
+    max_widths = [0] * len(columns)
     all_rows_data = []
     
-    for i in range(rows_to_show):
-        row = loop_obj.data[i]
-        if hasattr(row, 'keys'):  # OrderedDict-like row
-            row_data = {}
-            for col_key in loop_obj.columns:
-                col_val = row.get(col_key, None)
-                formatted_val = _format_constructor_value(col_val)
-                key_val_str = "'{}': {}".format(col_key, formatted_val)
-                row_data[col_key] = key_val_str
-                max_widths[col_key] = max(max_widths.get(col_key, 0), len(key_val_str))
+    for row in islice(data, rows_to_show):
+        if isinstance(row, dict) or hasattr(row, 'keys'):  # OrderedDict-like row
+            row_get = row.get
+            row_data = [prefix + format_value(row_get(col_key, None)) for col_key, prefix in column_prefixes]
+            for j, key_val_str in enumerate(row_data):
+                if len(key_val_str) > max_widths[j]:
+                    max_widths[j] = len(key_val_str)
             all_rows_data.append(row_data)
     
+    # Pad to align nicely (except for the last column)
+    last_column = columns[-1] if columns else None
+    widths = [0 if col_key == last_column else width for col_key, width in zip(columns, max_widths)]
+    
     # Second pass: format with proper alignment
-    data_items = []
+    separator_row = ""
     for row_data in all_rows_data:
-        dict_parts = []
-        for col_key in loop_obj.columns:
-            key_val_str = row_data.get(col_key, '')
-            # Pad to align nicely (except for the last column)
-            if col_key == loop_obj.columns[-1]:
-                # Don't pad the last column
-                dict_parts.append(key_val_str)
-            else:
-                padded_str = key_val_str.ljust(max_widths[col_key])
-                dict_parts.append(padded_str)
-        
-        data_items.append("{}{{ {} }}".format(data_indent, ", ".join(dict_parts)))
+        dict_parts = [key_val_str.ljust(width) for key_val_str, width in zip(row_data, widths)]
+        row_str = ", ".join(dict_parts)
+        write(f"{separator_row}{data_indent}{{ {row_str} }}")
+        separator_row = "\n"
     
-    if max_loop_rows is not None and data_len > max_loop_rows:
-        data_items.append("{}# ... ({} more rows)".format(data_indent, data_len - max_loop_rows))
-    
-    return "[\n{}\n{}]".format("\n".join(data_items), param_indent)
+    return bool(all_rows_data)
 
 
 def _format_constructor_value(value):
     """Format a value for constructor-style display."""
-    if value is None:
-        return "None"
-    elif isinstance(value, str):
+    # called for every loop cell - the exact-type checks and plain concatenation avoid isinstance and format calls
+    valueType = type(value)
+    if valueType is UnquotedValue or valueType is str or isinstance(value, str):
         if len(value) > 80:
-            return "'{}'...".format(value[:77])
-        else:
-            return "'{}'".format(value)
+            return "'" + value[:77] + "'..."
+        return "'" + value + "'"
+    elif value is None:
+        return "None"
     else:
         str_val = str(value)
         if len(str_val) > 80:
-            return "{}...".format(str_val[:77])
+            return str_val[:77] + "..."
         return str_val
 
 
@@ -300,11 +360,11 @@ def main():
         sys.exit(1)
     
     try:
-        # Dump the NEF as dictionaries
-        content = dump_nef_as_dict(filename, max_depth=max_depth, 
-                                  show_loop_data=show_loop_data, 
-                                  max_loop_rows=max_loop_rows)
-        print(content)
+        # Dump the NEF as dictionaries, streaming straight to stdout
+        dump_nef_as_dict_to(filename, sys.stdout, max_depth=max_depth, 
+                            show_loop_data=show_loop_data, 
+                            max_loop_rows=max_loop_rows)
+        print()
         
     except Exception as e:
         print("Error: {}".format(str(e)), file=sys.stderr)
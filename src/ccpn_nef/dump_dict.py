@@ -13,21 +13,50 @@ rather than the NEF format output.
 
 import sys
 import os
+from collections import OrderedDict
+from functools import lru_cache
 
 # Handle both module import and standalone execution
 try:
     from . import NefImporter
     from . import ErrorLog as el
+    from . import GenericStarParser
+    from . import StarIo
 except ImportError:
     # If running as standalone script, try direct import
     try:
         import NefImporter
         import ErrorLog as el
+        import GenericStarParser
+        import StarIo
     except ImportError:
         # Last resort - add current directory to path and import
         sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
         import NefImporter
         import ErrorLog as el
+        import GenericStarParser
+        import StarIo
+
+# Kinds of value shown by _traverse_structure
+_DICT, _LIST, _SCALAR = 0, 1, 2
+
+# The kinds of the types found in a parsed NEF file; other types are classified by probing attributes
+_TYPE_KINDS = {tt: _DICT for tt in (dict, OrderedDict, GenericStarParser.DataBlock, GenericStarParser.SaveFrame,
+                                    StarIo.NmrDataBlock, StarIo.NmrSaveFrame, NefImporter.NefDict)}
+_TYPE_KINDS.update({tt: _LIST for tt in (list, tuple)})
+_TYPE_KINDS.update({tt: _SCALAR for tt in (str, GenericStarParser.UnquotedValue, int, float, bool, type(None))})
+
+
+def _value_kind(value):
+    """Return the kind of value - _DICT, _LIST or _SCALAR."""
+    kind = _TYPE_KINDS.get(type(value))
+    if kind is not None:
+        return kind
+    if hasattr(value, 'keys'):
+        return _DICT
+    if hasattr(value, '__len__') and not isinstance(value, str):
+        return _LIST
+    return _SCALAR
 
 
 def dump_nef_structure(filename, max_depth=3, show_data=True, error_logging=el.NEF_STANDARD):
@@ -45,7 +74,7 @@ def dump_nef_structure(filename, max_depth=3, show_data=True, error_logging=el.N
     
     try:
         # Load the NEF file
-        importer.loadFile(filename)
+        importer.loadFile(filename, validate=False)
         
         # Get the internal dictionary structure
         nef_dict = importer._nefDict
@@ -70,21 +99,32 @@ def dump_nef_structure(filename, max_depth=3, show_data=True, error_logging=el.N
 
 
 def _traverse_structure(obj, output, indent="", depth=0, max_depth=3, show_data=True):
-    """Recursively traverse and display the NEF structure."""
+    """Traverse and display the NEF structure, depth first, using an explicit stack rather than recursion."""
     
     if depth >= max_depth:
         output.append("{}[max depth reached]".format(indent))
         return
     
-    if hasattr(obj, 'keys'):  # Dict-like object
-        for key in obj.keys():
-            value = obj[key]
+    if not hasattr(obj, 'keys'):
+        return
+    
+    # Stack of the dict-like objects being traversed, as (remaining items, indent, depth)
+    stack = [(iter(obj.items()), indent, depth)]
+    while stack:
+        items, indent, depth = stack[-1]
+        for key, value in items:
             type_name = type(value).__name__
+            kind = _value_kind(value)
             
-            if hasattr(value, 'keys'):  # Nested dict-like
+            if kind == _DICT:  # Nested dict-like
                 output.append("{}{}: {} ({})".format(indent, key, getattr(value, 'name', ''), type_name))
-                _traverse_structure(value, output, indent + "  ", depth + 1, max_depth, show_data)
-            elif hasattr(value, '__len__') and not isinstance(value, str):  # List-like
+                if depth + 1 >= max_depth:
+                    output.append("{}  [max depth reached]".format(indent))
+                else:
+                    # descend, resuming the items of this object afterwards
+                    stack.append((iter(value.items()), indent + "  ", depth + 1))
+                    break
+            elif kind == _LIST:  # List-like
                 output.append("{}{}: [{}] ({})".format(indent, key, len(value), type_name))
                 if show_data and len(value) > 0 and depth < max_depth - 1:
                     # Show first few items
@@ -98,11 +138,30 @@ def _traverse_structure(obj, output, indent="", depth=0, max_depth=3, show_data=
                     output.append("{}{}: {} ({})".format(indent, key, formatted_value, type_name))
                 else:
                     output.append("{}{}: ({})".format(indent, key, type_name))
+        else:
+            stack.pop()
+
+
+# Types whose formatted values are cached - floats are excluded as 0.0 and -0.0 compare equal
+_CACHED_FORMAT_TYPES = frozenset((str, GenericStarParser.UnquotedValue, int, bool, type(None)))
 
 
 def _format_value(value):
     """Format a value for display, truncating if necessary."""
-    str_val = str(value)
+    valueType = type(value)
+    if valueType in _CACHED_FORMAT_TYPES:
+        return _format_cached_value(valueType, value)
+    return _truncate(str(value))
+
+
+@lru_cache(maxsize=8192)
+def _format_cached_value(valueType, value):
+    """Format a hashable value for display; valueType keeps e.g. True and 1 apart in the cache."""
+    return _truncate(str(value))
+
+
+def _truncate(str_val):
+    """Truncate a formatted value to 100 characters."""
     if len(str_val) > 100:
         return str_val[:100] + "..."
     return str_val
@@ -29,7 +29,7 @@ def dump_nef_simple(filename):
         importer = NefImporter.NefImporter(errorLogging=ErrorLog.NEF_STANDARD)
         
         # Load the file
-        importer.loadFile(filename)
+        importer.loadFile(filename, validate=False)
         
         # Get the string representation using toString
         content = importer.toString()
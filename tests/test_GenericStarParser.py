@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""Tests for parsing and writing general Star files
+
+"""
+#=========================================================================================
+# Licence, Reference and Credits
+#=========================================================================================
+__copyright__ = "Copyright (C) CCPN project (http://www.ccpn.ac.uk) 2014 - 2020"
+__credits__ = ("Ed Brooksbank, Luca Mureddu, Timothy J Ragan & Geerten W Vuister")
+__licence__ = ("CCPN licence. See http://www.ccpn.ac.uk/v3-software/downloads/license")
+__reference__ = ("Skinner, S.P., Fogh, R.H., Boucher, W., Ragan, T.J., Mureddu, L.G., & Vuister, G.W.",
+                 "CcpNmr AnalysisAssign: a flexible platform for integrated NMR analysis",
+                 "J.Biomol.Nmr (2016), 66, 111-124, http://doi.org/10.1007/s10858-016-0060-y")
+#=========================================================================================
+# Start of code
+#=========================================================================================
+
+import glob
+import os
+from collections import OrderedDict
+
+import pytest
+
+from ccpn_nef import GenericStarParser
+
+
+TEST_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_data')
+LOOP_TEST_FILES = ('Commented_Example.nef', 'CCPN_XPLOR_test1.nef')
+NEF_TEST_FILES = sorted(glob.glob(os.path.join(TEST_DATA_PATH, '*.nef')))
+
+
+def _loops(dataExtent):
+    """Yield each Loop in dataExtent once, loops are stored under each of their columns"""
+    for dataBlock in dataExtent.values():
+        for saveFrame in dataBlock.values():
+            if isinstance(saveFrame, GenericStarParser.SaveFrame):
+                for tag, value in saveFrame.items():
+                    if isinstance(value, GenericStarParser.Loop) and tag == value.columns[0]:
+                        yield value
+
+
+@pytest.mark.parametrize('fileName', LOOP_TEST_FILES)
+def test_loop_rows_keep_column_order(fileName):
+    dataExtent = GenericStarParser.parseFile(os.path.join(TEST_DATA_PATH, fileName))
+
+    loops = list(_loops(dataExtent))
+    assert loops
+    for loop in loops:
+        for row in loop.data:
+            assert isinstance(row, GenericStarParser.LoopRow)
+            assert tuple(row) == loop.columns
+
+
+@pytest.mark.parametrize('fileName', LOOP_TEST_FILES)
+def test_loop_toString_matches_ordered_dict_rows(fileName):
+    dataExtent = GenericStarParser.parseFile(os.path.join(TEST_DATA_PATH, fileName))
+
+    for loop in _loops(dataExtent):
+        text = loop.toString()
+        loop.data = [OrderedDict(row) for row in loop.data]
+        assert loop.toString() == text
+
+
+@pytest.mark.parametrize('path', NEF_TEST_FILES, ids=os.path.basename)
+def test_parse_toString_round_trip(path):
+    with open(path) as fp:
+        text = fp.read()
+
+    starText = GenericStarParser.parse(text).toString()
+    assert GenericStarParser.parse(starText).toString() == starText
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""Tests for loading and validating Nef files with NefImporter
+
+"""
+#=========================================================================================
+# Licence, Reference and Credits
+#=========================================================================================
+__copyright__ = "Copyright (C) CCPN project (http://www.ccpn.ac.uk) 2014 - 2020"
+__credits__ = ("Ed Brooksbank, Luca Mureddu, Timothy J Ragan & Geerten W Vuister")
+__licence__ = ("CCPN licence. See http://www.ccpn.ac.uk/v3-software/downloads/license")
+__reference__ = ("Skinner, S.P., Fogh, R.H., Boucher, W., Ragan, T.J., Mureddu, L.G., & Vuister, G.W.",
+                 "CcpNmr AnalysisAssign: a flexible platform for integrated NMR analysis",
+                 "J.Biomol.Nmr (2016), 66, 111-124, http://doi.org/10.1007/s10858-016-0060-y")
+#=========================================================================================
+# Start of code
+#=========================================================================================
+
+import os
+
+from ccpn_nef import NefImporter as Nef
+from ccpn_nef import ErrorLog as el
+
+
+TEST_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_data')
+VALID_NEF = os.path.join(TEST_DATA_PATH, 'CCPN_XPLOR_test1.nef')
+INVALID_NEF = os.path.join(TEST_DATA_PATH, 'Commented_Example.nef')
+
+
+def test_loadFile_without_validation_clears_valid_state():
+    importer = Nef.NefImporter(errorLogging=el.NEF_SILENT)
+    importer.loadFile(VALID_NEF)
+    assert importer.isValid is True
+
+    importer.loadFile(INVALID_NEF, validate=False)
+    assert importer.isValid is False
+    assert not importer.validErrorLog
+
+
+def test_loadText_without_validation_clears_valid_state():
+    importer = Nef.NefImporter(errorLogging=el.NEF_SILENT)
+    importer.loadFile(VALID_NEF)
+    assert importer.isValid is True
+
+    with open(INVALID_NEF) as fp:
+        importer.loadText(fp.read(), validate=False)
+    assert importer.isValid is False
+    assert not importer.validErrorLog
+
+
+def test_explicit_validate_matches_implicit_validation():
+    for path in (VALID_NEF, INVALID_NEF):
+        implicit = Nef.NefImporter(errorLogging=el.NEF_SILENT)
+        implicit.loadFile(path)
+
+        explicit = Nef.NefImporter(errorLogging=el.NEF_SILENT)
+        explicit.loadFile(path, validate=False)
+        result = explicit.validate()
+
+        assert result == implicit.isValid
+        assert explicit.isValid == implicit.isValid
+        assert explicit.validErrorLog == implicit.validErrorLog
+        assert explicit.lastError == el.NEFVALID
+
+
+def test_validate_failure_sets_error_code():
+    importer = Nef.NefImporter(errorLogging=el.NEF_SILENT)
+    importer.loadFile(VALID_NEF, validate=False)
+
+    def _failingIsValid(*args, **kwargs):
+        raise RuntimeError('validation failed')
+
+    importer._validator.isValid = _failingIsValid
+    assert importer.validate() is None
+    assert importer.lastError == el.NEFERROR_BADVALIDATION
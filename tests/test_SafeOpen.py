@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""Tests for opening files without overwriting existing ones
+
+"""
+#=========================================================================================
+# Licence, Reference and Credits
+#=========================================================================================
+__copyright__ = "Copyright (C) CCPN project (http://www.ccpn.ac.uk) 2014 - 2020"
+__credits__ = ("Ed Brooksbank, Luca Mureddu, Timothy J Ragan & Geerten W Vuister")
+__licence__ = ("CCPN licence. See http://www.ccpn.ac.uk/v3-software/downloads/license")
+__reference__ = ("Skinner, S.P., Fogh, R.H., Boucher, W., Ragan, T.J., Mureddu, L.G., & Vuister, G.W.",
+                 "CcpNmr AnalysisAssign: a flexible platform for integrated NMR analysis",
+                 "J.Biomol.Nmr (2016), 66, 111-124, http://doi.org/10.1007/s10858-016-0060-y")
+#=========================================================================================
+# Start of code
+#=========================================================================================
+
+import os
+
+import pytest
+
+from ccpn_nef import SafeOpen
+
+
+def _touch(directory, *names):
+    for name in names:
+        with open(os.path.join(directory, name), 'w'):
+            pass
+
+
+def test_find_first_available_missing_path(tmp_path):
+    assert SafeOpen._find_first_available(str(tmp_path / 'test.nef')) == 0
+
+
+@pytest.mark.parametrize('count', [0, 1, 2, 3, 7, 8, 20])
+def test_find_first_available_contiguous(tmp_path, count):
+    _touch(tmp_path, 'test.nef', *('test(%d).nef' % ii for ii in range(1, count + 1)))
+    assert SafeOpen._find_first_available(str(tmp_path / 'test.nef')) == count + 1
+
+
+def test_find_first_available_gap(tmp_path):
+    # (3) is missing; the probe of 1, 2, 4, 8 finds (4) and skips the gap
+    _touch(tmp_path, 'test.nef', 'test(1).nef', 'test(2).nef', 'test(4).nef')
+    result = SafeOpen._find_first_available(str(tmp_path / 'test.nef'))
+    assert result == 5
+    assert not os.path.exists(tmp_path / ('test(%d).nef' % result))
+
+
+def test_safeOpen_skips_files_created_after_the_search(tmp_path, monkeypatch):
+    # (1) and (2) appear after the search for a free name, as if written by another process
+    _touch(tmp_path, 'test.nef')
+    monkeypatch.setattr(SafeOpen, '_find_first_available', lambda path: 1)
+    _touch(tmp_path, 'test(1).nef', 'test(2).nef')
+
+    with SafeOpen.safeOpen(str(tmp_path / 'test.nef'), 'w') as (fd, fileName):
+        fd.write('data')
+
+    assert fileName == str(tmp_path / 'test(3).nef')
+    with open(fileName) as fp:
+        assert fp.read() == 'data'
+    for name in ('test(1).nef', 'test(2).nef'):
+        with open(tmp_path / name) as fp:
+            assert fp.read() == ''
+
+
+def test_safeOpen_missing_path(tmp_path):
+    with SafeOpen.safeOpen(str(tmp_path / 'test.nef'), 'w') as (fd, fileName):
+        fd.write('data')
+    assert fileName == str(tmp_path / 'test.nef')
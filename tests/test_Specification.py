@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""Tests for converting mmcif dictionaries into Nef specifications
+
+"""
+#=========================================================================================
+# Licence, Reference and Credits
+#=========================================================================================
+__copyright__ = "Copyright (C) CCPN project (http://www.ccpn.ac.uk) 2014 - 2020"
+__credits__ = ("Ed Brooksbank, Luca Mureddu, Timothy J Ragan & Geerten W Vuister")
+__licence__ = ("CCPN licence. See http://www.ccpn.ac.uk/v3-software/downloads/license")
+__reference__ = ("Skinner, S.P., Fogh, R.H., Boucher, W., Ragan, T.J., Mureddu, L.G., & Vuister, G.W.",
+                 "CcpNmr AnalysisAssign: a flexible platform for integrated NMR analysis",
+                 "J.Biomol.Nmr (2016), 66, 111-124, http://doi.org/10.1007/s10858-016-0060-y")
+#=========================================================================================
+# Start of code
+#=========================================================================================
+
+from ccpn_nef import Specification
+
+
+# the mini_child loop is described before its parent mini_parent loop
+MINIMAL_DICTIONARY = """data_mini
+
+_dictionary.version  1.0
+
+loop_
+   _dictionary_history.version
+   _dictionary_history.update
+   _dictionary_history.revision
+   1.0  2020-01-01  'first version'
+stop_
+
+loop_
+   _item_type_list.code
+   _item_type_list.primitive_code
+   _item_type_list.construct
+   _item_type_list.detail
+   code  char  '[A-Za-z0-9_]*'  'code item types'
+stop_
+
+save_mini_frame
+   _category.description       'a saveframe without examples'
+   _category.id                mini_frame
+   _category.mandatory_code    no
+   _category_key.name          '_mini_frame.sf_framecode'
+save_
+
+save_mini_child
+   _category.description           'loop nested in mini_parent'
+   _category.id                    mini_child
+   _category.parent_category_id    mini_parent
+   _category.mandatory_code        no
+   _category_key.name              '_mini_child.index'
+save_
+
+save_mini_parent
+   _category.description           'loop in mini_frame'
+   _category.id                    mini_parent
+   _category.parent_category_id    mini_frame
+   _category.mandatory_code        no
+   _category_key.name              '_mini_parent.index'
+save_
+
+save__mini_frame.sf_framecode
+   _item.name              '_mini_frame.sf_framecode'
+   _item.category_id       mini_frame
+   _item.mandatory_code    yes
+   _item_type.code         code
+save_
+
+save__mini_parent.index
+   _item.name              '_mini_parent.index'
+   _item.category_id       mini_parent
+   _item.mandatory_code    yes
+   _item_type.code         code
+save_
+
+save__mini_child.index
+   _item.name              '_mini_child.index'
+   _item.category_id       mini_child
+   _item.mandatory_code    yes
+   _item_type.code         code
+save_
+"""
+
+
+def _convert(text, skipExamples=True):
+    messages = []
+    converter = Specification.CifDicConverter(text, skipExamples=skipExamples, logger=messages.append)
+    return converter.convertToNef(), messages
+
+
+def test_child_loop_before_parent():
+    result, messages = _convert(MINIMAL_DICTIONARY)
+
+    saveFrame = result['nef_saveframe_mini_frame']
+    assert [row['category'] for row in saveFrame['nef_loop'].data] == ['mini_parent', 'mini_child']
+    assert [(row['name'], row['loop_category']) for row in saveFrame['nef_item'].data] == \
+           [('sf_framecode', None), ('index', 'mini_parent'), ('index', 'mini_child')]
+    assert not any('missing parent' in message for message in messages)
+
+
+def test_loop_missing_parent_is_logged():
+    text = MINIMAL_DICTIONARY + """
+save_mini_orphan
+   _category.description           'loop without a parent category'
+   _category.id                    mini_orphan
+   _category.parent_category_id    mini_unknown
+   _category.mandatory_code        no
+   _category_key.name              '_mini_orphan.index'
+save_
+"""
+    result, messages = _convert(text)
+
+    missing = [message for message in messages if 'missing parent' in message]
+    assert len(missing) == 1
+    assert 'mini_orphan mini_unknown' in missing[0]
+    assert 'categories known' in missing[0]
+
+
+def test_categories_without_examples():
+    result, messages = _convert(MINIMAL_DICTIONARY, skipExamples=False)
+
+    saveFrame = result['nef_saveframe_mini_frame']
+    assert 'example' not in saveFrame
+    assert [row['example'] for row in saveFrame['nef_loop'].data] == [None, None]
+    assert [(row['example_1'], row['example_2']) for row in saveFrame['nef_item'].data] == [(None, None)] * 3
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""Tests for converting parsed Star files into Nmr data structures
+
+"""
+#=========================================================================================
+# Licence, Reference and Credits
+#=========================================================================================
+__copyright__ = "Copyright (C) CCPN project (http://www.ccpn.ac.uk) 2014 - 2020"
+__credits__ = ("Ed Brooksbank, Luca Mureddu, Timothy J Ragan & Geerten W Vuister")
+__licence__ = ("CCPN licence. See http://www.ccpn.ac.uk/v3-software/downloads/license")
+__reference__ = ("Skinner, S.P., Fogh, R.H., Boucher, W., Ragan, T.J., Mureddu, L.G., & Vuister, G.W.",
+                 "CcpNmr AnalysisAssign: a flexible platform for integrated NMR analysis",
+                 "J.Biomol.Nmr (2016), 66, 111-124, http://doi.org/10.1007/s10858-016-0060-y")
+#=========================================================================================
+# Start of code
+#=========================================================================================
+
+import pytest
+
+from ccpn_nef import GenericStarParser, StarIo
+
+
+# a DataBlock holding an item outside any saveframe
+NON_SAVEFRAME_ELEMENT = """data_test
+_nef_nmr_meta_data.format_name  nmr_exchange_format
+"""
+
+# a SaveFrame without an sf_category item
+MISSING_SF_CATEGORY = """data_test
+save_nef_nmr_meta_data
+   _nef_nmr_meta_data.sf_framecode  nef_nmr_meta_data
+save_
+"""
+
+
+def _validationError(func, *args, **kwargs):
+    with pytest.raises(StarIo.StarValidationError) as excInfo:
+        func(*args, **kwargs)
+    return str(excInfo.value)
+
+
+@pytest.mark.parametrize('text', [NON_SAVEFRAME_ELEMENT, MISSING_SF_CATEGORY])
+def test_strict_and_single_pass_validation_errors_match(text):
+    strictError = _validationError(StarIo.parseNef, text, mode='strict')
+    singlePassError = _validationError(StarIo.parseNef, text, mode='standard')
+    assert strictError == singlePassError
+
+
+def test_bad_datablock_name_errors_match():
+    dataExtent = GenericStarParser.parse(MISSING_SF_CATEGORY)
+    dataBlock = next(iter(dataExtent.values()))
+    dataBlock.name = 'test'
+
+    preValidateError = _validationError(StarIo._StarDataConverter(dataExtent, fileType='nef').preValidateDataBlock,
+                                        dataBlock)
+    convertError = _validationError(StarIo._StarDataConverter(dataExtent, fileType='nef').convertDataBlock,
+                                    dataBlock, validate=True)
+    assert preValidateError == convertError
+    assert "DataBlock name  must be 'global_' or start with 'data_'" in convertError
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""Tests for tokenising Star files
+
+"""
+#=========================================================================================
+# Licence, Reference and Credits
+#=========================================================================================
+__copyright__ = "Copyright (C) CCPN project (http://www.ccpn.ac.uk) 2014 - 2020"
+__credits__ = ("Ed Brooksbank, Luca Mureddu, Timothy J Ragan & Geerten W Vuister")
+__licence__ = ("CCPN licence. See http://www.ccpn.ac.uk/v3-software/downloads/license")
+__reference__ = ("Skinner, S.P., Fogh, R.H., Boucher, W., Ragan, T.J., Mureddu, L.G., & Vuister, G.W.",
+                 "CcpNmr AnalysisAssign: a flexible platform for integrated NMR analysis",
+                 "J.Biomol.Nmr (2016), 66, 111-124, http://doi.org/10.1007/s10858-016-0060-y")
+#=========================================================================================
+# Start of code
+#=========================================================================================
+
+import glob
+import os
+
+import pytest
+
+from ccpn_nef import StarTokeniser
+
+
+TEST_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_data')
+NEF_TEST_FILES = sorted(glob.glob(os.path.join(TEST_DATA_PATH, '*.nef')))
+
+
+@pytest.mark.parametrize('path', NEF_TEST_FILES, ids=os.path.basename)
+def test_iterTokenTuples_matches_getTokenIterator(path):
+    with open(path) as fp:
+        text = fp.read()
+
+    tokens = list(StarTokeniser.iterTokenTuples(text))
+    assert tokens
+    assert tokens == [tuple(token) for token in StarTokeniser.getTokenIterator(text)]